@@ -1,5 +1,6 @@
 """This module provides some base classes and common items."""
 
+import copy
 import enum
 import secrets
 from typing import Callable, Type
@@ -67,6 +68,11 @@ class Hash:
 
         raise NotImplementedError
 
+    def copy(self) -> "Hash":
+        """Get an independent copy of current state."""
+
+        return copy.deepcopy(self)
+
     def value(self) -> bytes:
         """Returns current hash value in bytes.
 
@@ -134,6 +140,19 @@ class SMCoreBase:
         hash_obj.update(data)
         return hash_obj.value()
 
+    def _counter_hash_fn(self, Z: bytes) -> Callable[[int], bytes]:
+        """Get a function of `ct` returning `H(Z || ct)`, the hash state of Z is computed only once."""
+
+        prefix = self._hash_cls()
+        prefix.update(Z)
+
+        def hash_fn(ct: int) -> bytes:
+            hash_obj = prefix.copy()
+            hash_obj.update(ct.to_bytes(4, "big"))
+            return hash_obj.value()
+
+        return hash_fn
+
     def _randint(self, a: int, b: int) -> int:
         bitlength = b.bit_length()
         while True:
@@ -153,18 +172,19 @@ class SMCoreBase:
             DataOverflowError: `klen` is too large.
         """
 
-        hash_fn = self._hash_fn
         v = self._hash_cls.hash_length()
 
         count, tail = divmod(klen, v)
         if count + (tail > 0) > 0xffffffff:
             raise DataOverflowError("Key stream", f"{0xffffffff * v} bytes")
 
+        hash_fn = self._counter_hash_fn(Z)
+
         K = bytearray()
         for ct in range(1, count + 1):
-            K.extend(hash_fn(Z + ct.to_bytes(4, "big")))
+            K.extend(hash_fn(ct))
 
         if tail > 0:
-            K.extend(hash_fn(Z + (count + 1).to_bytes(4, "big"))[:tail])
+            K.extend(hash_fn(count + 1)[:tail])
 
         return bytes(K)
@@ -4,7 +4,8 @@ This module provides fundamental operations related to elliptic curves,
     including but not limited to those specified in the national cryptographic standard documents.
 """
 
-from typing import Tuple, Union
+import functools
+from typing import List, Tuple, Union
 
 from . import primefield as Fp
 from .errors import *
@@ -27,6 +28,29 @@ EcPoint12 = Tuple[Fp.Fp12Ele, Fp.Fp12Ele]
 EcPointEx = Tuple[Fp.FpExEle, Fp.FpExEle]
 
 
+def _wnaf(k: int, w: int) -> List[int]:
+    """Get width-w NAF digits of a non-negative k, least significant digit first.
+
+    Every non-zero digit is odd and less than `2^(w-1)` in absolute value, followed by at least `w - 1` zeros.
+    """
+
+    mask = (1 << w) - 1
+    half = 1 << (w - 1)
+
+    digits = []
+    while k:
+        if k & 1:
+            d = k & mask
+            if d >= half:
+                d -= mask + 1
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
 class EllipticCurve:
     """Elliptic Curve.
 
@@ -38,6 +62,9 @@ class EllipticCurve:
 
     INF = (float("inf"), float("inf"))
 
+    _WNAF_W = 5  # window width of variable-base scalar multiplication
+    _WNAF_MIN_BITS = 32  # smaller scalars do not pay off the table
+
     def __init__(self, fp: Fp.PrimeFieldBase, a: Fp.FpExEle, b: Fp.FpExEle) -> None:
         """Elliptic curve.
 
@@ -55,6 +82,10 @@ class EllipticCurve:
         self.b = b
         self._fp = fp
 
+        if isinstance(fp, Fp.PrimeField):
+            self.jac_dbl = self._jac_dbl_fp
+            self.jac_add = self._jac_add_fp
+
     def get_y_sqr(self, x: Fp.FpExEle) -> Fp.FpExEle:
         """Get the square of y for the specified x."""
 
@@ -107,20 +138,355 @@ class EllipticCurve:
         y3 = fp.sub(fp.mul(lam, fp.sub(x1, x3)), y1)
         return x3, y3
 
+    def add_batch(self, P1s: List[EcPointEx], P2s: List[EcPointEx]) -> List[EcPointEx]:
+        """Add points pairwise, sharing a single inversion among all pairs."""
+
+        fp = self._fp
+
+        Ps = []
+        lams = []  # (index, numerator, denominator)
+        for i, (P1, P2) in enumerate(zip(P1s, P2s)):
+            if P1 == self.INF or P2 == self.INF:
+                Ps.append(self.add(P1, P2))
+                continue
+
+            x1, y1 = P1
+            x2, y2 = P2
+
+            if x1 != x2:
+                lams.append((i, fp.sub(y2, y1), fp.sub(x2, x1)))
+            elif y1 == y2 and not fp.isoppo(y1, y2):
+                lams.append((i, fp.add(self.a, fp.smul(3, fp.mul(x1, x1))), fp.smul(2, y1)))
+            else:
+                Ps.append(self.add(P1, P2))
+                continue
+            Ps.append(None)
+
+        invs = fp.inv_batch([den for _, _, den in lams])
+        for (i, num, _), inv in zip(lams, invs):
+            x1, y1 = P1s[i]
+            x2, _ = P2s[i]
+            lam = fp.mul(num, inv)
+            x3 = fp.sub(fp.mul(lam, lam), fp.add(x1, x2))
+            y3 = fp.sub(fp.mul(lam, fp.sub(x1, x3)), y1)
+            Ps[i] = (x3, y3)
+
+        return Ps
+
     def sub(self, P1: EcPointEx, P2: EcPointEx) -> EcPointEx:
         """Substract two points."""
 
         return self.add(P1, self.neg(P2))
 
+    def to_jacobian(self, P: EcPointEx) -> Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]:
+        """Convert affine point to Jacobian coordinates `(X, Y, Z)`, where `x = X / Z^2, y = Y / Z^3`."""
+
+        fp = self._fp
+
+        if P == self.INF:
+            return (fp.one(), fp.one(), fp.zero())
+
+        x, y = P
+        return (x, y, fp.one())
+
+    def to_affine(self, P: Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]) -> EcPointEx:
+        """Convert Jacobian point to affine coordinates."""
+
+        fp = self._fp
+
+        X, Y, Z = P
+        if fp.iszero(Z):
+            return self.INF
+
+        iZ = fp.inv(Z)
+        iZ2 = fp.mul(iZ, iZ)
+        return fp.mul(X, iZ2), fp.mul(Y, fp.mul(iZ2, iZ))
+
+    def to_affine_batch(self, Ps: List[Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]]) -> List[EcPointEx]:
+        """Convert many Jacobian points to affine coordinates, sharing a single inversion."""
+
+        fp = self._fp
+
+        iZs = iter(fp.inv_batch([Z for _, _, Z in Ps if not fp.iszero(Z)]))
+
+        Qs = []
+        for X, Y, Z in Ps:
+            if fp.iszero(Z):
+                Qs.append(self.INF)
+                continue
+            iZ = next(iZs)
+            iZ2 = fp.mul(iZ, iZ)
+            Qs.append((fp.mul(X, iZ2), fp.mul(Y, fp.mul(iZ2, iZ))))
+        return Qs
+
+    def jac_dbl(self, P: Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]) -> Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]:
+        """Double point in Jacobian coordinates."""
+
+        fp = self._fp
+        m = fp.mul
+        s = fp.sub
+
+        X1, Y1, Z1 = P
+        if fp.iszero(Z1) or fp.iszero(Y1):
+            return (fp.one(), fp.one(), fp.zero())
+
+        XX = m(X1, X1)
+        YY = m(Y1, Y1)
+        S = fp.smul(4, m(X1, YY))
+        M = fp.smul(3, XX)
+        if not fp.iszero(self.a):
+            ZZ = m(Z1, Z1)
+            M = fp.add(M, m(self.a, m(ZZ, ZZ)))
+
+        X3 = s(m(M, M), fp.add(S, S))
+        Y3 = s(m(M, s(S, X3)), fp.smul(8, m(YY, YY)))
+        Z3 = fp.smul(2, m(Y1, Z1))
+        return X3, Y3, Z3
+
+    def jac_add(self, P1: Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle],
+                P2: Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]) -> Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]:
+        """Add two points in Jacobian coordinates, cheaper if `Z` of P2 is one."""
+
+        fp = self._fp
+        m = fp.mul
+        s = fp.sub
+
+        X1, Y1, Z1 = P1
+        X2, Y2, Z2 = P2
+
+        if fp.iszero(Z1):
+            return P2
+        if fp.iszero(Z2):
+            return P1
+
+        Z1Z1 = m(Z1, Z1)
+        U2 = m(X2, Z1Z1)
+        S2 = m(Y2, m(Z1, Z1Z1))
+        if fp.isone(Z2):
+            U1 = X1
+            S1 = Y1
+        else:
+            Z2Z2 = m(Z2, Z2)
+            U1 = m(X1, Z2Z2)
+            S1 = m(Y1, m(Z2, Z2Z2))
+
+        H = s(U2, U1)
+        r = s(S2, S1)
+        if fp.iszero(H):
+            if fp.iszero(r):
+                return self.jac_dbl(P1)
+            return (fp.one(), fp.one(), fp.zero())
+
+        HH = m(H, H)
+        HHH = m(H, HH)
+        V = m(U1, HH)
+
+        X3 = s(m(r, r), fp.add(HHH, fp.add(V, V)))
+        Y3 = s(m(r, s(V, X3)), m(S1, HHH))
+        Z3 = m(Z1, H) if fp.isone(Z2) else m(m(Z1, Z2), H)
+        return X3, Y3, Z3
+
+    def _jac_dbl_fp(self, P: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        """`jac_dbl` on prime field, with integer operations inlined."""
+
+        p = self._fp.p
+
+        X1, Y1, Z1 = P
+        if Z1 == 0 or Y1 == 0:
+            return (1, 1, 0)
+
+        YY = (Y1 * Y1) % p
+        S = (4 * X1 * YY) % p
+        M = 3 * X1 * X1
+        if self.a:
+            ZZ = (Z1 * Z1) % p
+            M += self.a * ZZ * ZZ
+        M %= p
+
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        Z3 = (2 * Y1 * Z1) % p
+        return X3, Y3, Z3
+
+    def _jac_add_fp(self, P1: Tuple[int, int, int], P2: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        """`jac_add` on prime field, with integer operations inlined."""
+
+        p = self._fp.p
+
+        X1, Y1, Z1 = P1
+        X2, Y2, Z2 = P2
+
+        if Z1 == 0:
+            return P2
+        if Z2 == 0:
+            return P1
+
+        Z1Z1 = (Z1 * Z1) % p
+        U2 = (X2 * Z1Z1) % p
+        S2 = (Y2 * Z1 * Z1Z1) % p
+        if Z2 == 1:
+            U1 = X1
+            S1 = Y1
+        else:
+            Z2Z2 = (Z2 * Z2) % p
+            U1 = (X1 * Z2Z2) % p
+            S1 = (Y1 * Z2 * Z2Z2) % p
+
+        # |H|, |r| < p, left unreduced as they are only multiplied further
+        H = U2 - U1
+        r = S2 - S1
+        if H == 0:
+            if r == 0:
+                return self._jac_dbl_fp(P1)
+            return (1, 1, 0)
+
+        HH = (H * H) % p
+        HHH = (H * HH) % p
+        V = (U1 * HH) % p
+
+        X3 = (r * r - HHH - 2 * V) % p
+        Y3 = (r * (V - X3) - S1 * HHH) % p
+        Z3 = (Z1 * Z2 * H) % p
+        return X3, Y3, Z3
+
+    def _odd_multiples(self, P: EcPointEx, n: int) -> List[EcPointEx]:
+        """Get odd multiples `[P, 3P, ..., (2n - 1)P]` of P.
+
+        Built with co-Z doubling and additions (Meloni, Goundar-Joye), the running 2P is kept on the same `Z`
+            as the last multiple, and all multiples are normalized with one batched inversion.
+        """
+
+        fp = self._fp
+        add = fp.add
+        sub = fp.sub
+        mul = fp.mul
+        sqr = fp.sqr
+        smul = fp.smul
+
+        if P != self.INF and not fp.iszero(P[1]):
+            # (2P, P) on the same Z
+            x, y = P
+            B = sqr(x)
+            E = sqr(y)
+            L = sqr(E)
+            S = smul(2, sub(sub(sqr(add(x, E)), B), L))
+            M = add(smul(3, B), self.a)
+            X = sub(sqr(M), smul(2, S))
+            Z = smul(2, y)
+            D = (X, sub(mul(M, sub(S, X)), smul(8, L)), Z)
+            Ts = [(S, smul(8, L), Z)]
+
+            for _ in range(n - 1):
+                X1, Y1, Z = D
+                X2, Y2, _ = Ts[-1]
+                dx = sub(X1, X2)
+                if fp.iszero(dx):
+                    break
+                # (2P + T, 2P) on the same Z
+                C = sqr(dx)
+                W1 = mul(X1, C)
+                W2 = mul(X2, C)
+                dy = sub(Y1, Y2)
+                A1 = mul(Y1, sub(W1, W2))
+                X3 = sub(sub(sqr(dy), W1), W2)
+                Z = mul(Z, dx)
+                Ts.append((X3, sub(mul(dy, sub(W1, X3)), A1), Z))
+                D = (W1, A1, Z)
+            else:
+                return self.to_affine_batch(Ts)
+
+        # P of small order
+        _2P = self.add(P, P)
+        Ps = [P]
+        for _ in range(n - 1):
+            Ps.append(self.add(Ps[-1], _2P))
+        return Ps
+
+    def _wnaf_table(self, P: EcPointEx) -> List[Tuple[Fp.FpExEle, Fp.FpExEle, Fp.FpExEle]]:
+        """Get table of P for width-w NAF, `table[d >> 1] = d * P` for every odd digit d, positive or negative.
+
+        Entries are in Jacobian coordinates with `Z = 1`, so that additions take the mixed path.
+        """
+
+        neg = self._fp.neg
+
+        odds = [self.to_jacobian(T) for T in self._odd_multiples(P, 1 << (self._WNAF_W - 2))]
+        return odds + [(X, neg(Y), Z) for X, Y, Z in reversed(odds)]
+
+    def _mul_wnaf(self, ks: List[int], tables: List[list]) -> EcPointEx:
+        """Get sum of `k * P` over non-negative ks, the width-w NAF digits are interleaved to share all doublings."""
+
+        jac_dbl = self.jac_dbl
+        jac_add = self.jac_add
+
+        digits = [_wnaf(k, self._WNAF_W) for k in ks]
+        length = max(map(len, digits))
+        digits = [ds + [0] * (length - len(ds)) for ds in digits]
+
+        Q = self.to_jacobian(self.INF)
+        for i in range(length - 1, -1, -1):
+            Q = jac_dbl(Q)
+            for ds, table in zip(digits, tables):
+                d = ds[i]
+                if d:
+                    Q = jac_add(Q, table[d >> 1])
+        return self.to_affine(Q)
+
     def mul(self, k: int, P: EcPointEx) -> EcPointEx:
-        """Scalar multiplication of point by k."""
+        """Scalar multiplication of point by k, using width-w NAF.
 
-        Q = P
-        for i in f"{k:b}"[1:]:
-            Q = self.add(Q, Q)
+        Intermediate points are kept in Jacobian coordinates, only two inversions are needed,
+            one for the table of odd multiples of P and one at the end.
+        """
+
+        if k < 0:
+            return self.mul(-k, self.neg(P))
+
+        if k.bit_length() > self._WNAF_MIN_BITS:
+            return self._mul_wnaf([k], [self._wnaf_table(P)])
+
+        jac_dbl = self.jac_dbl
+        jac_add = self.jac_add
+
+        _P = self.to_jacobian(P)
+        Q = self.to_jacobian(self.INF)
+        for i in f"{k:b}":
+            Q = jac_dbl(Q)
             if i == "1":
-                Q = self.add(Q, P)
-        return Q
+                Q = jac_add(Q, _P)
+        return self.to_affine(Q)
+
+    def mul_ladder(self, k: int, P: EcPointEx) -> EcPointEx:
+        """Scalar multiplication of point by k, using Montgomery ladder.
+
+        Each bit of k costs exactly one addition and one doubling, used for secret scalars.
+        """
+
+        if k < 0:
+            return self.mul_ladder(-k, self.neg(P))
+
+        jac_add = self.jac_add
+        jac_dbl = self.jac_dbl
+
+        R = [self.to_jacobian(self.INF), self.to_jacobian(P)]
+        for i in range(k.bit_length() - 1, -1, -1):
+            b = (k >> i) & 1
+            R[1 - b] = jac_add(R[0], R[1])
+            R[b] = jac_dbl(R[b])
+        return self.to_affine(R[0])
+
+    def mul2(self, k1: int, P1: EcPointEx, k2: int, P2: EcPointEx) -> EcPointEx:
+        """Get k1 * P1 + k2 * P2, using interleaved width-w NAF to share doublings (Shamir's trick)."""
+
+        if k1 < 0:
+            return self.mul2(-k1, self.neg(P1), k2, P2)
+        if k2 < 0:
+            return self.mul2(k1, P1, -k2, self.neg(P2))
+
+        return self._mul_wnaf([k1, k2], [self._wnaf_table(P1), self._wnaf_table(P2)])
+
+
+_ECDLP_CACHE = {}
 
 
 class ECDLP:
@@ -152,10 +518,102 @@ class ECDLP:
         self.fpn = Fp.PrimeField(n)
         self.h = h
 
+        self._G_table = None  # built on first use of `kG`
+        self._G_wnaf_table = None  # built on first use of `kG_add_kP`
+        self._P_wnaf_table = functools.lru_cache(maxsize=16)(self.ec._wnaf_table)  # for long-lived public keys
+
+    @classmethod
+    def get(cls, p: int, a: int, b: int, G: EcPoint, n: int, h: int = 1) -> "ECDLP":
+        """Get a shared `ECDLP` instance for the given parameters, precomputation is done only once for each curve.
+
+        Args:
+            p: Parameter p of curve.
+            a: Parameter a of curve.
+            b: Parameter b of curve.
+            G: Base point.
+            n: Order of base point.
+            h: Cofactor of `G`, default to `1`.
+        """
+
+        key = (p, a, b, G, n, h)
+        ecdlp = _ECDLP_CACHE.get(key)
+        if ecdlp is None:
+            ecdlp = _ECDLP_CACHE.setdefault(key, cls(p, a, b, G, n, h))
+        return ecdlp
+
+    # window width of fixed-base table
+    _W = 6
+
+    def _precompute_G(self):
+        """Precompute fixed-base table, `table[i][j] = j * 2^(i*w) * G` in Jacobian coordinates with `Z = 1`.
+
+        Rows are independent, so each column is built with one batched addition over all rows.
+        """
+
+        ec = self.ec
+
+        bases = [self.G]
+        for _ in range((self.fpn.p_bitlength + self._W - 1) // self._W - 1):
+            B = bases[-1]
+            for _ in range(self._W):
+                B = ec.add(B, B)
+            bases.append(B)
+
+        table = [[ec.INF, B] for B in bases]
+        for _ in range(2, 1 << self._W):
+            for row, P in zip(table, ec.add_batch([row[-1] for row in table], bases)):
+                row.append(P)
+
+        return [[ec.to_jacobian(P) for P in row] for row in table]
+
     def kG(self, k: int) -> EcPoint:
         """Scalar multiplication of G by k."""
 
-        return self.ec.mul(k, self.G)
+        table = self._G_table
+        if table is None:
+            table = self._G_table = self._precompute_G()
+
+        if k < 0 or k.bit_length() > len(table) * self._W:
+            return self.ec.mul_ladder(k, self.G)
+
+        ec = self.ec
+        jac_add = ec.jac_add
+        mask = (1 << self._W) - 1
+
+        # table points are affine, i.e. Z = 1, which takes the mixed addition path
+        Q = ec.to_jacobian(ec.INF)
+        for row in table:
+            j = k & mask
+            if j:
+                Q = jac_add(Q, row[j])
+            k >>= self._W
+        return ec.to_affine(Q)
+
+    def kG_add_kP(self, k1: int, k2: int, P: EcPoint) -> EcPoint:
+        """Get k1 * G + k2 * P for public scalars and point, the width-w NAF tables of G and recent Ps are cached."""
+
+        if k1 < 0 or k2 < 0:
+            return self.ec.mul2(k1, self.G, k2, P)
+
+        table = self._G_wnaf_table
+        if table is None:
+            table = self._G_wnaf_table = self.ec._wnaf_table(self.G)
+
+        return self.ec._mul_wnaf([k1, k2], [table, self._P_wnaf_table(tuple(P))])
+
+    def kP(self, k: int, P: EcPoint) -> EcPoint:
+        """Scalar multiplication of P by a secret k, using Montgomery ladder.
+
+        k is padded with multiples of the curve order `h * n` to a fixed bit length,
+            so that every k takes the same number of ladder steps.
+        """
+
+        N = self.h * self.fpn.p
+        k %= N
+        k += N
+        if k.bit_length() == N.bit_length():
+            k += N
+        return self.ec.mul_ladder(k, P)
 
 
 class SM9BNBP:
@@ -241,6 +699,9 @@ class SM9BNBP:
         self._frob3_factor = (((p - w3, w3), (w0, p - w0)), ((p - w0, w0), (p - w3, w3)), ((w3, p - w3), (p - w0, w0)))
         self._frob6_factor = (((p - w0, p - w0), (w0, w0)), ((w0, w0), (p - w0, p - w0)), ((p - w0, p - w0), (w0, w0)))
 
+        self._G2_lines = None  # built on first use of `eG2`
+        self._get_lines = functools.lru_cache(maxsize=8)(self._miller_lines)  # for master public keys, used by `eG1`
+
     def kG1(self, k: int) -> EcPoint:
         """Scalar multiplication of G1 by k."""
 
@@ -251,24 +712,23 @@ class SM9BNBP:
 
         return self.ec2.mul(k, self.G2)
 
-    def _g_fn(self, U: EcPoint12, V: EcPoint12, Q: EcPoint12) -> Fp.Fp12Ele:
-        """g(U, V)(Q).
+    def _line(self, U: EcPoint12, V: EcPoint12) -> Union[Tuple[Fp.Fp12Ele, Fp.Fp12Ele, Fp.Fp12Ele], None]:
+        """Coefficients `(lam, xV, yV)` of line through U and V, `lam` is `None` for vertical line.
 
-        U, V, Q are Fp12 points.
+        U, V are Fp12 points, `None` means g(U, V) is constant one.
         """
 
         fp12 = self.fp12
 
-        if U == EllipticCurve.INF or V == EllipticCurve.INF or Q == EllipticCurve.INF:
-            return fp12.one()
+        if U == EllipticCurve.INF or V == EllipticCurve.INF:
+            return None
 
         xU, yU = U
         xV, yV = V
-        xQ, yQ = Q
 
         if xU == xV:
             if fp12.isoppo(yU, yV):
-                return fp12.sub(xQ, xV), fp12.one()
+                return None, xV, yV
             elif yU == yV:
                 lam = fp12.mul(
                     fp12.smul(3, fp12.mul(xV, xV)),
@@ -279,8 +739,22 @@ class SM9BNBP:
         else:
             lam = fp12.mul(fp12.sub(yU, yV), fp12.inv(fp12.sub(xU, xV)))
 
-        g = fp12.sub(fp12.mul(lam, fp12.sub(xQ, xV)), fp12.sub(yQ, yV))
-        return g
+        return lam, xV, yV
+
+    def _line_eval(self, line: Union[Tuple[Fp.Fp12Ele, Fp.Fp12Ele, Fp.Fp12Ele], None], Q: EcPoint12) -> Fp.Fp12Ele:
+        """Evaluate line at Fp12 point Q."""
+
+        fp12 = self.fp12
+
+        if line is None or Q == EllipticCurve.INF:
+            return fp12.one()
+
+        lam, xV, yV = line
+        xQ, yQ = Q
+
+        if lam is None:
+            return fp12.sub(xQ, xV)
+        return fp12.sub(fp12.mul(lam, fp12.sub(xQ, xV)), fp12.sub(yQ, yV))
 
     def _phi(self, P: EcPoint2) -> EcPoint12:
         """Get x, y in E (Fp12) from E' (Fp2), only implemented for beta=(1, 0)."""
@@ -357,7 +831,7 @@ class SM9BNBP:
         y4 = P(M(f_t2_p, f_t), 18)
         y3 = P(f_t_p, 12)
         y2 = P(f_t2_p2, 6)
-        y1 = M(f, f)
+        y1 = fp12.sqr(f)
         y0 = M(f_p, M(f_p2, f_p3))
 
         f_num = M(y2, y0)
@@ -366,58 +840,86 @@ class SM9BNBP:
         f = M(f_num, I(f_den))
         return f
 
-    def e(self, P: EcPoint, Q: EcPoint2) -> Fp.Fp12Ele:
-        """R-ate bilinear pairing.
-
-        Args:
-            P: Element of group 1.
-            Q: Element of group 2.
-
-        Returns:
-            Fp12Ele: Pairing value on Fp12.
-        """
+    def _miller_lines(self, Q: EcPoint2) -> list:
+        """All lines of Miller loop for Q, only depends on Q."""
 
         fp12 = self.fp12
         ec2 = self.ec2
         phi = self._phi
-        g_fn = self._g_fn
+        line = self._line
 
-        _P = (fp12.extend(P[0]), fp12.extend(P[1]))  # P on E(Fp12)
         _Q = phi(Q)  # Q on E(Fp12)
 
+        lines = []
         T = Q
-        f = fp12.one()
         for i in self._e_a:
             _T = phi(T)  # T on E(Fp12)
-            g = g_fn(_T, _T, _P)
-            f = fp12.mul(fp12.mul(f, f), g)
+            lines.append(line(_T, _T))
             T = ec2.add(T, T)
 
             if i == "1":
-                g = g_fn(phi(T), _Q, _P)
-                f = fp12.mul(f, g)
+                lines.append(line(phi(T), _Q))
                 T = ec2.add(T, Q)
 
         _Q1 = (self._frob1(_Q[0]), self._frob1(_Q[1]))
         _Q2 = (self._frob2(_Q[0]), fp12.neg(self._frob2(_Q[1])))
 
-        g = g_fn(phi(T), _Q1, _P)
-        f = fp12.mul(f, g)
+        lines.append(line(phi(T), _Q1))
 
         T = ec2.add(T, self._phi_inv(_Q1))
 
-        g = g_fn(phi(T), _Q2, _P)
-        f = fp12.mul(f, g)
+        lines.append(line(phi(T), _Q2))
+
+        return lines
+
+    def _miller_loop(self, P: EcPoint, lines: list) -> Fp.Fp12Ele:
+        """Evaluate Miller lines at P, with final exponentiation."""
+
+        fp12 = self.fp12
+        line_eval = self._line_eval
+
+        _P = (fp12.extend(P[0]), fp12.extend(P[1]))  # P on E(Fp12)
+
+        lines = iter(lines)
+
+        f = fp12.one()
+        for i in self._e_a:
+            f = fp12.mul(fp12.sqr(f), line_eval(next(lines), _P))
+            if i == "1":
+                f = fp12.mul(f, line_eval(next(lines), _P))
+
+        for line in lines:
+            f = fp12.mul(f, line_eval(line, _P))
 
         f = self._finalexp(f)
         return f
 
+    def e(self, P: EcPoint, Q: EcPoint2) -> Fp.Fp12Ele:
+        """R-ate bilinear pairing.
+
+        Nothing is cached, Q may be a secret point.
+
+        Args:
+            P: Element of group 1.
+            Q: Element of group 2.
+
+        Returns:
+            Fp12Ele: Pairing value on Fp12.
+        """
+
+        return self._miller_loop(P, self._miller_lines(Q))
+
     def eG1(self, Q: EcPoint2) -> Fp.Fp12Ele:
-        """R-ate of G1 and Q."""
+        """R-ate of G1 and Q.
+
+        Q must be public (e.g. master public key), its Miller lines are cached.
+        """
 
-        return self.e(self.G1, Q)
+        return self._miller_loop(self.G1, self._get_lines(Q))
 
     def eG2(self, P: EcPoint) -> Fp.Fp12Ele:
-        """R-ate of P and G2."""
+        """R-ate of P and G2, Miller lines of G2 are computed once."""
 
-        return self.e(P, self.G2)
+        if self._G2_lines is None:
+            self._G2_lines = self._miller_lines(self.G2)
+        return self._miller_loop(P, self._G2_lines)
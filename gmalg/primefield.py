@@ -5,7 +5,8 @@ This module provides basic operations on extension fields.
     as detailed in the SM9 standard documentation.
 """
 
-from typing import Tuple, Union
+import sys
+from typing import List, Tuple, Union
 
 from .errors import *
 
@@ -115,11 +116,37 @@ class PrimeFieldBase:
 
         raise NotImplementedError
 
+    def sqr(self, x: FpExEle) -> FpExEle:
+        """Square of element."""
+
+        raise NotImplementedError
+
     def inv(self, x: FpExEle) -> FpExEle:
         """Inverse of element."""
 
         raise NotImplementedError
 
+    def inv_batch(self, xs: List[FpExEle]) -> List[FpExEle]:
+        """Inverse of many non-zero elements with a single inversion (Montgomery's trick)."""
+
+        if not xs:
+            return []
+
+        mul = self.mul
+
+        prods = [xs[0]]
+        for x in xs[1:]:
+            prods.append(mul(prods[-1], x))
+
+        ys = [None] * len(xs)
+        t = self.inv(prods[-1])
+        for i in range(len(xs) - 1, 0, -1):
+            ys[i] = mul(t, prods[i - 1])
+            t = mul(t, xs[i])
+        ys[0] = t
+
+        return ys
+
     def pow(self, x: FpExEle, e: int) -> FpExEle:
         """Get the exponentiation of x raised to the power of e."""
 
@@ -183,18 +210,19 @@ class PrimeField(PrimeFieldBase):
         self._u, self._r = divmod(self.p, 8)
 
         if self._r == 1:
+            self._ts_params = None  # computed on first use
             self.sqrt = self._sqrt_8u1
-        elif self._r == 3:
-            self._u = self._u * 2
+        elif self._r == 3 or self._r == 7:
+            self._sqrt_exp = (self.p + 1) >> 2
             self.sqrt = self._sqrt_4u3
         elif self._r == 5:
             self.sqrt = self._sqrt_8u5
-        elif self._r == 7:
-            self._u = self._u * 2 + 1
-            self.sqrt = self._sqrt_4u3
         else:
             raise InvalidArgumentError(f"0x{p:x} is not a prime number.")
 
+        if sys.version_info >= (3, 8):
+            self.inv = self._inv_pow
+
     def isoppo(self, x: int, y: int) -> bool:
         return x == 0 and y == 0 or x + y == self.p
 
@@ -219,7 +247,19 @@ class PrimeField(PrimeFieldBase):
     def mul(self, x: int, y: int) -> int:
         return (x * y) % self.p
 
+    def sqr(self, x: int) -> int:
+        return (x * x) % self.p
+
+    def _inv_pow(self, x: int) -> int:
+        """Modular inverse computed by built-in `pow`, available since Python 3.8."""
+
+        try:
+            return pow(x, -1, self.p)
+        except ValueError:
+            return 0
+
     def inv(self, x: int):
+        """Extended Euclidean algorithm."""
         r1 = self.p
         r2 = x
         t1 = 0
@@ -236,34 +276,30 @@ class PrimeField(PrimeFieldBase):
     def pow(self, x: int, e: int) -> int:
         return pow(x, e, self.p)
 
-    def _lucas(self, X: int, Y: int, k: int) -> Tuple[int, int]:
-        """Lucas sequence, k begin at 0.
+    def _tonelli_shanks_params(self) -> Tuple[int, int, int]:
+        """Precompute `s`, `q` and `c` for Tonelli-Shanks, where `p - 1 = q * 2^s` and `c = z^q` for a non-residue `z`.
 
-        Uk = X * Uk-1 - Y * Uk-2
-        Vk = X * Vk-1 - Y * Vk-2
-
-        Returns:
-            (int, int): The k-th lucas value pair.
+        The least non-residue of a prime is below `2 * ln(p)^2` (under GRH), so only that many `z` are tried.
         """
 
         p = self.p
 
-        delta = (X * X - 4 * Y) % p
-        inv2 = self.inv(2)
+        q, s = p - 1, 0
+        while q & 1 == 0:
+            q >>= 1
+            s += 1
 
-        U, V = 0, 2
-        for i in f"{k:b}":
-            U, V = (U * V) % p, ((V * V + delta * U * U) * inv2) % p
-            if i == "1":
-                U, V = ((X * U + V) * inv2) % p, ((X * V + delta * U) * inv2) % p
-        return U, V
+        for z in range(2, min(p, 2 * self.p_bitlength ** 2)):
+            if pow(z, (p - 1) >> 1, p) == p - 1:
+                return s, q, pow(z, q, p)
+
+        raise InvalidArgumentError(f"0x{p:x} is not a prime number.")
 
     def _sqrt_4u3(self, x: int) -> Union[int, None]:
         """sqrt_8u3 and sqrt_8u7"""
         p = self.p
-        u = self._u
 
-        y = pow(x, u + 1, p)
+        y = pow(x, self._sqrt_exp, p)
         if (y * y) % p == x:
             return y
         return None
@@ -272,6 +308,9 @@ class PrimeField(PrimeFieldBase):
         p = self.p
         u = self._u
 
+        if x == 0:
+            return 0
+
         z = pow(x, 2 * u + 1, p)
         if z == 1:
             return pow(x, u + 1, p)
@@ -280,22 +319,31 @@ class PrimeField(PrimeFieldBase):
         return None
 
     def _sqrt_8u1(self, x: int) -> Union[int, None]:
+        """Tonelli-Shanks."""
         p = self.p
-        p_1 = p - 1
-        _4u1 = 4 * self._u + 1
-        inv2 = self.inv(2)
-
-        Y = x
-        for X in range(1, p):
-            U, V = self._lucas(X, Y, _4u1)
-
-            if (V * V - 4 * Y) % p == 0:
-                return (V * inv2) % p
 
-            if U != 1 or U != p_1:
-                return None
+        if x == 0:
+            return 0
+        if pow(x, (p - 1) >> 1, p) != 1:
+            return None
 
-        return None
+        if self._ts_params is None:
+            self._ts_params = self._tonelli_shanks_params()
+
+        m, q, c = self._ts_params
+        y = pow(x, (q + 1) >> 1, p)
+        t = pow(x, q, p)
+        while t != 1:
+            i, t2 = 1, (t * t) % p
+            while t2 != 1:
+                t2 = (t2 * t2) % p
+                i += 1
+            b = pow(c, 1 << (m - i - 1), p)
+            y = (y * b) % p
+            c = (b * b) % p
+            t = (t * c) % p
+            m = i
+        return y
 
     def sqrt(self, x: int) -> Union[int, None]:
         raise NotImplementedError
@@ -387,6 +435,21 @@ class PrimeField2(PrimeFieldBase):
 
         return Z1, Z0
 
+    def sqr(self, X: Fp2Ele) -> Fp2Ele:
+        a = self.fp.add
+        s = self.fp.sub
+        m = self.fp.mul
+
+        X1, X0 = X
+        U = self._ALPHA
+
+        # (X0 + X1)(X0 + U X1) = X0^2 + U X1^2 + (1 + U) X1 X0
+        X1mX0 = m(X1, X0)
+        Z1 = a(X1mX0, X1mX0)
+        Z0 = s(m(a(X0, X1), a(X0, m(U, X1))), m(1 + U, X1mX0))
+
+        return Z1, Z0
+
     def inv(self, X: Fp2Ele) -> Fp2Ele:
         n = self.fp.neg
         s = self.fp.sub
@@ -410,7 +473,7 @@ class PrimeField2(PrimeFieldBase):
     def pow(self, X: Fp2Ele, e: int) -> Fp2Ele:
         Y = X
         for i in f"{e:b}"[1:]:
-            Y = self.mul(Y, Y)
+            Y = self.sqr(Y)
             if i == "1":
                 Y = self.mul(Y, X)
         return Y
@@ -536,6 +599,20 @@ class PrimeField4(PrimeFieldBase):
 
         return Z1, Z0
 
+    def sqr(self, X: Fp4Ele) -> Fp4Ele:
+        a = self.fp2.add
+        m = self.fp2.mul
+        q = self.fp2.sqr
+
+        X1, X0 = X
+        U = self._ALPHA
+
+        X1mX0 = m(X1, X0)
+        Z1 = a(X1mX0, X1mX0)
+        Z0 = a(m(U, q(X1)), q(X0))
+
+        return Z1, Z0
+
     def inv(self, X: Fp4Ele) -> Fp4Ele:
         n = self.fp2.neg
         s = self.fp2.sub
@@ -559,7 +636,7 @@ class PrimeField4(PrimeFieldBase):
     def pow(self, X: Fp4Ele, e: int) -> Fp4Ele:
         Y = X
         for i in f"{e:b}"[1:]:
-            Y = self.mul(Y, Y)
+            Y = self.sqr(Y)
             if i == "1":
                 Y = self.mul(Y, X)
         return Y
@@ -669,6 +746,30 @@ class PrimeField12(PrimeFieldBase):
 
         return Z2, Z1, Z0
 
+    def sqr(self, X: Fp12Ele) -> Fp12Ele:
+        a = self.fp4.add
+        s = self.fp4.sub
+        m = self.fp4.mul
+        q = self.fp4.sqr
+
+        X2, X1, X0 = X
+        U = self._ALPHA
+
+        # Chung-Hasan SQR2
+        S0 = q(X0)
+        X1mX0 = m(X1, X0)
+        S1 = a(X1mX0, X1mX0)
+        S2 = q(a(s(X0, X1), X2))
+        X1mX2 = m(X1, X2)
+        S3 = a(X1mX2, X1mX2)
+        S4 = q(X2)
+
+        Z2 = s(a(S1, a(S2, S3)), a(S0, S4))
+        Z1 = a(S1, m(U, S4))
+        Z0 = a(S0, m(U, S3))
+
+        return Z2, Z1, Z0
+
     def inv(self, X: Fp12Ele) -> Fp12Ele:
         a = self.fp4.add
         s = self.fp4.sub
@@ -696,7 +797,7 @@ class PrimeField12(PrimeFieldBase):
     def pow(self, X: Fp12Ele, e: int) -> Fp12Ele:
         Y = X
         for i in f"{e:b}"[1:]:
-            Y = self.mul(Y, Y)
+            Y = self.sqr(Y)
             if i == "1":
                 Y = self.mul(Y, X)
         return Y
@@ -1,5 +1,6 @@
 """SM2 Algorithm Implementation Module."""
 
+import functools
 import math
 from typing import Callable, Tuple, Type
 
@@ -7,7 +8,7 @@ from . import ellipticcurve as Ec
 from .base import KEYXCHG_MODE, PC_MODE, Hash, SMCoreBase
 from .errors import *
 from .sm3 import SM3
-from .utils import bytes_to_int, int_to_bytes
+from .utils import bytes_to_int, int_to_bytes, xor_bytes
 
 __all__ = [
     "SM2",
@@ -15,7 +16,7 @@ __all__ = [
     "KEYXCHG_MODE",
 ]
 
-_ecdlp = Ec.ECDLP(
+_ecdlp = Ec.ECDLP.get(
     0xFFFFFFFE_FFFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFFF_00000000_FFFFFFFF_FFFFFFFF,
     0xFFFFFFFE_FFFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFFF_00000000_FFFFFFFF_FFFFFFFC,
     0x28E9FA9E_9D9F5E34_4D5A9E4B_CF6509A7_F39789F5_15AB8F92_DDBCBD41_4D940E93,
@@ -82,10 +83,10 @@ def bytes_to_point(b: bytes) -> Ec.EcPoint:
     if mode == 0x00:
         return ec.INF
 
-    point = b[1:]
-    x = fp.btoe(point[:fp.e_length])
+    length = fp.e_length
+    x = fp.btoe(b[1:1 + length])
     if mode == 0x04 or mode == 0x06 or mode == 0x07:
-        return x, fp.btoe(point[fp.e_length:])
+        return x, fp.btoe(b[1 + length:])
     elif mode == 0x02 or mode == 0x03:
         y = ec.get_y(x)
         if y is None:
@@ -98,6 +99,43 @@ def bytes_to_point(b: bytes) -> Ec.EcPoint:
         raise InvalidPCError(mode)
 
 
+@functools.lru_cache(maxsize=16)
+def _entity_info(ecdlp: Ec.ECDLP, hash_cls: Type[Hash], uid: bytes, pk: Ec.EcPoint) -> bytes:
+    """ZA of uid and pk, shared by all cores on the same curve, so long-lived keys are hashed only once."""
+
+    ENTL = len(uid) << 3
+    if ENTL.bit_length() >= 16:
+        raise DataOverflowError("ID", "8192 bytes")
+
+    etob = ecdlp.fp.etob
+    xP, yP = pk
+    xG, yG = ecdlp.G
+
+    Z = bytearray()
+    Z.extend(ENTL.to_bytes(2, "big"))
+    Z.extend(uid)
+    Z.extend(etob(ecdlp.ec.a))
+    Z.extend(etob(ecdlp.ec.b))
+    Z.extend(etob(xG))
+    Z.extend(etob(yG))
+    Z.extend(etob(xP))
+    Z.extend(etob(yP))
+
+    hash_obj = hash_cls()
+    hash_obj.update(Z)
+    return hash_obj.value()
+
+
+
+@functools.lru_cache(maxsize=16)
+def _za_hash_obj(hash_cls: Type[Hash], za: bytes) -> Hash:
+    """Hash state after absorbing ZA, only copied by users, never updated in place."""
+
+    hash_obj = hash_cls()
+    hash_obj.update(za)
+    return hash_obj
+
+
 class SM2Core(SMCoreBase):
     """SM2 Core Algorithms.
 
@@ -183,25 +221,14 @@ class SM2Core(SMCoreBase):
             DataOverflowError: ID length more than 8192 bytes.
         """
 
-        ENTL = len(uid) << 3
-        if ENTL.bit_length() >= 16:
-            raise DataOverflowError("ID", "8192 bytes")
+        return _entity_info(self.ecdlp, self._hash_cls, bytes(uid), tuple(pk))
 
-        etob = self.ecdlp.fp.etob
-        xP, yP = pk
-        xG, yG = self.ecdlp.G
-
-        Z = bytearray()
-        Z.extend(ENTL.to_bytes(2, "big"))
-        Z.extend(uid)
-        Z.extend(etob(self.ecdlp.ec.a))
-        Z.extend(etob(self.ecdlp.ec.b))
-        Z.extend(etob(xG))
-        Z.extend(etob(yG))
-        Z.extend(etob(xP))
-        Z.extend(etob(yP))
+    def _message_hash_fn(self, message: bytes, uid: bytes, pk: Ec.EcPoint) -> bytes:
+        """Get `H(ZA || M)`, the hash state of ZA is computed only once for same uid and pk."""
 
-        return self._hash_fn(Z)
+        hash_obj = _za_hash_obj(self._hash_cls, self.entity_info(uid, pk)).copy()
+        hash_obj.update(message)
+        return hash_obj.value()
 
     def sign(self, message: bytes, sk: int, uid: bytes, pk: Ec.EcPoint = None) -> Tuple[int, int]:
         """Generate signature on the message.
@@ -220,7 +247,7 @@ class SM2Core(SMCoreBase):
         if pk is None:
             pk = self.generate_pk(sk)
 
-        e = bytes_to_int(self._hash_fn(self.entity_info(uid, pk) + message))
+        e = bytes_to_int(self._message_hash_fn(message, uid, pk))
 
         ecdlp = self.ecdlp
         fpn = self.ecdlp.fpn
@@ -252,7 +279,6 @@ class SM2Core(SMCoreBase):
             bool: Whether OK.
         """
 
-        ec = self.ecdlp.ec
         fpn = self.ecdlp.fpn
 
         if r < 1 or r > fpn.p - 1:
@@ -265,9 +291,9 @@ class SM2Core(SMCoreBase):
         if fpn.iszero(t):
             return False
 
-        e = int.from_bytes(self._hash_fn(self.entity_info(uid, pk) + message), "big")
+        e = int.from_bytes(self._message_hash_fn(message, uid, pk), "big")
 
-        x, _ = ec.add(self.ecdlp.kG(s), ec.mul(t, pk))
+        x, _ = self.ecdlp.kG_add_kP(s, t, pk)
         if fpn.add(e, x) != r:
             return False
 
@@ -301,7 +327,7 @@ class SM2Core(SMCoreBase):
             if ec.mul(self.ecdlp.h, pk) == ec.INF:
                 raise InfinitePointError(f"Infinite point encountered, [0x{self.ecdlp.h:x}](0x{pk[0]:x}, 0x{pk[1]:x})")
 
-            x2, y2 = ec.mul(k, pk)
+            x2, y2 = self.ecdlp.kP(k, pk)
             x2 = self.ecdlp.fp.etob(x2)
             y2 = self.ecdlp.fp.etob(y2)
 
@@ -309,7 +335,7 @@ class SM2Core(SMCoreBase):
             if not any(t):
                 continue
 
-            C2 = bytes(map(lambda b1, b2: b1 ^ b2, plain, t))
+            C2 = xor_bytes(plain, t)
             C3 = self._hash_fn(x2 + plain + y2)
 
             return (x1, y1), C2, C3
@@ -341,7 +367,7 @@ class SM2Core(SMCoreBase):
         if ec.mul(self.ecdlp.h, C1) == ec.INF:
             raise InfinitePointError(f"Infinite point encountered, [0x{self.ecdlp.h:x}](0x{C1[0]:x}, 0x{C1[1]:x})")
 
-        x2, y2 = ec.mul(sk, C1)
+        x2, y2 = self.ecdlp.kP(sk, C1)
         x2 = self.ecdlp.fp.etob(x2)
         y2 = self.ecdlp.fp.etob(y2)
 
@@ -349,7 +375,7 @@ class SM2Core(SMCoreBase):
         if not any(t):
             raise UnknownError("Zero bytes key stream.")
 
-        M = bytes(map(lambda b1, b2: b1 ^ b2, C2, t))
+        M = xor_bytes(C2, t)
 
         if self._hash_fn(x2 + M + y2) != C3:
             raise CheckFailedError("Incorrect hash value.")
@@ -361,6 +387,14 @@ class SM2Core(SMCoreBase):
 
         return self._2w + (x & self._2w_1)
 
+    def _ephemeral_point(self, r: int) -> Ec.EcPoint:
+        return self.ecdlp.kG(r)
+
+    def _cache_ephemeral_points(self) -> None:
+        """Cache ephemeral points by random number, only for tests and benchmarks with a fixed `rnd_fn`."""
+
+        self._ephemeral_point = functools.lru_cache(maxsize=64)(self._ephemeral_point)
+
     def begin_key_exchange(self, sk: int) -> Tuple[Ec.EcPoint, int]:
         """Generate data to begin key exchange.
 
@@ -376,7 +410,7 @@ class SM2Core(SMCoreBase):
         fpn = ecdlp.fpn
 
         r = self._randint(1, fpn.p - 1)
-        R = ecdlp.kG(r)
+        R = self._ephemeral_point(r)
         t = fpn.add(sk, fpn.mul(self._x_bar(R[0]), r))
 
         return R, t
@@ -402,7 +436,8 @@ class SM2Core(SMCoreBase):
         if not ec.isvalid(R):
             raise PointNotOnCurveError(R)
 
-        S = ec.mul(self.ecdlp.h * t, ec.add(pk, ec.mul(self._x_bar(R[0]), R)))
+        # [h * t](pk + [x_bar]R), only the secret t goes through the ladder
+        S = self.ecdlp.kP(self.ecdlp.h * t, ec.add(pk, ec.mul(self._x_bar(R[0]), R)))
 
         if S == ec.INF:
             raise InfinitePointError("Infinite point encountered.")
@@ -1,5 +1,6 @@
 """SM3 Algorithm Implementation Module."""
 
+import struct
 from typing import List
 
 from .base import Hash
@@ -8,6 +9,9 @@ from .utils import ROL32
 
 __all__ = ["SM3"]
 
+_IV = (0x7380166f, 0x4914b2b9, 0x172442d7, 0xda8a0600, 0xa96f30bc, 0x163138aa, 0xe38dee4d, 0xb0fb0e4e)
+_BLOCK = struct.Struct(">16I")
+
 _ROL_T_TABLE = [
     0x79cc4519, 0xf3988a32, 0xe7311465, 0xce6228cb, 0x9cc45197, 0x3988a32f, 0x7311465e, 0xe6228cbc,
     0xcc451979, 0x988a32f3, 0x311465e7, 0x6228cbce, 0xc451979c, 0x88a32f39, 0x11465e73, 0x228cbce6,
@@ -28,51 +32,58 @@ def _T(i):
     return 0x79cc4519 if i <= 15 else 0x7a879d8a
 
 
-def _FF(i, X, Y, Z):
-    return (X ^ Y ^ Z) if i <= 15 else ((X & Y) | (X & Z) | (Y & Z))
-
-
-def _GG(i, X, Y, Z):
-    return (X ^ Y ^ Z) if i <= 15 else ((X & Y) | (~X & Z))
-
-
-def _P0(X):
-    return X ^ ROL32(X, 9) ^ ROL32(X, 17)
-
+def _expand(B: bytes, W: List[int]):
+    """Expand message block into 68 words, W' is derived on the fly in `_compress`."""
 
-def _P1(X):
-    return X ^ ROL32(X, 15) ^ ROL32(X, 23)
-
-
-def _expand(B: bytes, W1: List[int], W2: List[int]):
-    """Expand message block."""
-
-    for i in range(16):
-        W1[i] = int.from_bytes(B[i * 4:i * 4 + 4], "big")
+    W[:16] = _BLOCK.unpack(B)
     for i in range(16, 68):
-        W1[i] = _P1(W1[i - 16] ^ W1[i - 9] ^ ROL32(W1[i - 3], 15)) ^ ROL32(W1[i - 13], 7) ^ W1[i - 6]
-    for i in range(64):
-        W2[i] = W1[i] ^ W1[i + 4]
+        X = W[i - 3]
+        X = W[i - 16] ^ W[i - 9] ^ (((X << 15) | (X >> 17)) & 0xffffffff)
+        Y = W[i - 13]
+        W[i] = (X ^ (((X << 15) | (X >> 17)) & 0xffffffff) ^ (((X << 23) | (X >> 9)) & 0xffffffff) ^
+                (((Y << 7) | (Y >> 25)) & 0xffffffff) ^ W[i - 6])
+
 
+def _compress(W: List[int], V: List[int]):
+    """Compress words.
 
-def _compress(W1: List[int], W2: List[int], V: List[int]):
-    """Compress words."""
+    Rotations, FF, GG and P0 are inlined, and rounds are split at 16 so that no branch is taken per round.
+    """
 
+    T = _ROL_T_TABLE
     A, B, C, D, E, F, G, H = V
 
-    for i in range(64):
-        SS1 = ROL32((ROL32(A, 12) + E + _ROL_T_TABLE[i]) & 0xffffffff, 7)
-        SS2 = SS1 ^ ROL32(A, 12)
-        TT1 = (_FF(i, A, B, C) + D + SS2 + W2[i]) & 0xffffffff
-        TT2 = (_GG(i, E, F, G) + H + SS1 + W1[i]) & 0xffffffff
+    for i in range(16):
+        A12 = ((A << 12) | (A >> 20)) & 0xffffffff
+        SS1 = (A12 + E + T[i]) & 0xffffffff
+        SS1 = ((SS1 << 7) | (SS1 >> 25)) & 0xffffffff
+        Wi = W[i]
+        TT1 = ((A ^ B ^ C) + D + (SS1 ^ A12) + (Wi ^ W[i + 4])) & 0xffffffff
+        TT2 = ((E ^ F ^ G) + H + SS1 + Wi) & 0xffffffff
+        D = C
+        C = ((B << 9) | (B >> 23)) & 0xffffffff
+        B = A
+        A = TT1
+        H = G
+        G = ((F << 19) | (F >> 13)) & 0xffffffff
+        F = E
+        E = TT2 ^ (((TT2 << 9) | (TT2 >> 23)) & 0xffffffff) ^ (((TT2 << 17) | (TT2 >> 15)) & 0xffffffff)
+
+    for i in range(16, 64):
+        A12 = ((A << 12) | (A >> 20)) & 0xffffffff
+        SS1 = (A12 + E + T[i]) & 0xffffffff
+        SS1 = ((SS1 << 7) | (SS1 >> 25)) & 0xffffffff
+        Wi = W[i]
+        TT1 = (((A & B) | (C & (A | B))) + D + (SS1 ^ A12) + (Wi ^ W[i + 4])) & 0xffffffff
+        TT2 = ((G ^ (E & (F ^ G))) + H + SS1 + Wi) & 0xffffffff
         D = C
-        C = ROL32(B, 9)
+        C = ((B << 9) | (B >> 23)) & 0xffffffff
         B = A
         A = TT1
         H = G
-        G = ROL32(F, 19)
+        G = ((F << 19) | (F >> 13)) & 0xffffffff
         F = E
-        E = _P0(TT2)
+        E = TT2 ^ (((TT2 << 9) | (TT2 >> 23)) & 0xffffffff) ^ (((TT2 << 17) | (TT2 >> 15)) & 0xffffffff)
 
     V[0] ^= A
     V[1] ^= B
@@ -102,12 +113,12 @@ class SM3(Hash):
     def __init__(self) -> None:
         """SM3 Algorithm."""
 
-        self._value: List[int] = [0x7380166f, 0x4914b2b9, 0x172442d7, 0xda8a0600, 0xa96f30bc, 0x163138aa, 0xe38dee4d, 0xb0fb0e4e]
+        self._value: List[int] = list(_IV)
         self._msg_len: int = 0
-        self._msg_block_buffer: bytearray = bytearray()
+        self._msg_block_buffer: bytearray = bytearray(64)
+        self._msg_block_length: int = 0
 
-        self._words_buffer1: List[int] = [0] * 68
-        self._words_buffer2: List[int] = [0] * 64
+        self._words_buffer: List[int] = [0] * 68
 
     def update(self, data: bytes) -> None:
         """Update internal state.
@@ -123,32 +134,47 @@ class SM3(Hash):
             raise DataOverflowError("Message", f"0x{self.max_msg_length():x} bytes")
 
         B = self._msg_block_buffer
-        W1 = self._words_buffer1
-        W2 = self._words_buffer2
+        W = self._words_buffer
         V = self._value
 
-        b_len = len(B)
+        data = memoryview(data)
+        b_len = self._msg_block_length
         d_len = len(data)
         if b_len + d_len >= 64:
             # process last short block
             begin = 64 - b_len
-            B.extend(data[:begin])
-            _expand(B, W1, W2)
-            _compress(W1, W2, V)
-            B.clear()
+            B[b_len:] = data[:begin]
+            _expand(B, W)
+            _compress(W, V)
 
             pos = begin
             while pos + 63 < d_len:
-                _expand(data[pos:pos+64], W1, W2)
-                _compress(W1, W2, V)
+                _expand(data[pos:pos+64], W)
+                _compress(W, V)
                 pos += 64
 
-            B.extend(data[pos:])
+            b_len = d_len - pos
+            B[:b_len] = data[pos:]
         else:
-            B.extend(data)
+            B[b_len:b_len + d_len] = data
+            b_len += d_len
+
+        self._msg_block_length = b_len
 
         self._msg_len += d_len
 
+    def copy(self) -> "SM3":
+        """Get an independent copy of current state."""
+
+        cls = type(self)
+        other = cls.__new__(cls)
+        other._value = self._value.copy()
+        other._msg_len = self._msg_len
+        other._msg_block_buffer = self._msg_block_buffer.copy()
+        other._msg_block_length = self._msg_block_length
+        other._words_buffer = [0] * 68
+        return other
+
     def value(self) -> bytes:
         """Get current hash value.
 
@@ -160,31 +186,22 @@ class SM3(Hash):
                 so it is advisable to retain the resulting hash value after the method call.
         """
 
-        B = self._msg_block_buffer.copy()
-        W1 = self._words_buffer1
-        W2 = self._words_buffer2
+        b_len = self._msg_block_length
+        B = bytearray(64)
+        B[:b_len] = self._msg_block_buffer[:b_len]
+        W = self._words_buffer
         V = self._value.copy()
 
-        b_len = len(B)
+        B[b_len] = 0x80
 
-        B.append(0x80)
-
-        if b_len < 56:
-            for _ in range(b_len + 1, 56):
-                B.append(0x00)
-        else:
-            for _ in range(b_len + 1, 64):
-                B.append(0x00)
-            _expand(B, W1, W2)
-            _compress(W1, W2, V)
-            B = bytearray(56)
+        if b_len >= 56:
+            _expand(B, W)
+            _compress(W, V)
+            B[:] = bytes(64)
 
-        B.extend((self._msg_len << 3).to_bytes(8, "big"))
+        B[56:] = (self._msg_len << 3).to_bytes(8, "big")
 
-        _expand(B, W1, W2)
-        _compress(W1, W2, V)
+        _expand(B, W)
+        _compress(W, V)
 
-        value = bytearray()
-        for w in V:
-            value.extend(w.to_bytes(4, "big"))
-        return bytes(value)
+        return struct.pack(">8I", *V)
@@ -1,12 +1,13 @@
 """SM4 Algorithm Implementation Module."""
 
 import os
+import struct
 from typing import Optional
 from typing import List
 
 from .base import BlockCipher
 from .errors import *
-from .utils import ROL32
+from .utils import ROL32, xor_bytes
 
 __all__ = ["SM4"]
 
@@ -37,30 +38,39 @@ _CK = [
 ]
 
 
-def _BS(X):
-    return ((_S_BOX[(X >> 24) & 0xff] << 24) |
-            (_S_BOX[(X >> 16) & 0xff] << 16) |
-            (_S_BOX[(X >> 8) & 0xff] << 8) |
-            (_S_BOX[X & 0xff]))
+def _L0(X):
+    return X ^ ROL32(X, 2) ^ ROL32(X, 10) ^ ROL32(X, 18) ^ ROL32(X, 24)
 
 
-def _T0(X):
-    X = _BS(X)
-    return X ^ ROL32(X, 2) ^ ROL32(X, 10) ^ ROL32(X, 18) ^ ROL32(X, 24)
+def _L1(X):
+    return X ^ ROL32(X, 13) ^ ROL32(X, 23)
+
+
+def _precomp_t_table(L):
+    """S-box combined with linear transformation `L`, one table for each input byte position."""
+
+    return tuple([L(_S_BOX[b] << s) for b in range(256)] for s in (24, 16, 8, 0))
+
+
+_T0_TABLE = _precomp_t_table(_L0)
+_T1_TABLE = _precomp_t_table(_L1)
+
+_WORDS = struct.Struct(">4I")
 
 
 def _T1(X):
-    X = _BS(X)
-    return X ^ ROL32(X, 13) ^ ROL32(X, 23)
+    T3, T2, T1, T0 = _T1_TABLE
+    return T3[X >> 24] ^ T2[(X >> 16) & 0xff] ^ T1[(X >> 8) & 0xff] ^ T0[X & 0xff]
 
 
 def _key_expand(key: bytes, rkey: List[int]):
     """Key expansion."""
 
-    K0 = int.from_bytes(key[0:4], "big") ^ 0xa3b1bac6
-    K1 = int.from_bytes(key[4:8], "big") ^ 0x56aa3350
-    K2 = int.from_bytes(key[8:12], "big") ^ 0x677d9197
-    K3 = int.from_bytes(key[12:16], "big") ^ 0xb27022dc
+    K0, K1, K2, K3 = _WORDS.unpack(key)
+    K0 ^= 0xa3b1bac6
+    K1 ^= 0x56aa3350
+    K2 ^= 0x677d9197
+    K3 ^= 0xb27022dc
 
     for i in range(0, 32, 4):
         K0 = K0 ^ _T1(K1 ^ K2 ^ K3 ^ _CK[i])
@@ -73,6 +83,31 @@ def _key_expand(key: bytes, rkey: List[int]):
         rkey[i + 3] = K3
 
 
+def _gen_crypt():
+    """Generate `_crypt` with all 32 rounds unrolled, round keys are unpacked into locals once per block."""
+
+    X = ["X0", "X1", "X2", "X3"]
+    lines = [
+        "def _crypt(data: bytes, offset: int, RK: List[int]) -> bytes:",
+        "    T3, T2, T1, T0 = _T0_TABLE",
+        "    X0, X1, X2, X3 = _WORDS.unpack_from(data, offset)",
+        "    " + ", ".join(f"K{i}" for i in range(32)) + " = RK",
+    ]
+    for i in range(32):
+        lines.append(f"    X = {X[(i + 1) % 4]} ^ {X[(i + 2) % 4]} ^ {X[(i + 3) % 4]} ^ K{i}")
+        lines.append(f"    {X[i % 4]} ^= T3[X >> 24] ^ T2[(X >> 16) & 0xff] ^ T1[(X >> 8) & 0xff] ^ T0[X & 0xff]")
+    lines.append("    return _WORDS.pack(X3, X2, X1, X0)")
+
+    namespace = {}
+    exec("\n".join(lines), globals(), namespace)
+    _crypt = namespace["_crypt"]
+    _crypt.__doc__ = "Run 32 rounds on the block at `offset` of `data`, with round keys `RK`."
+    return _crypt
+
+
+_crypt = _gen_crypt()
+
+
 class SM4(BlockCipher):
     """SM4 Algorithm."""
 
@@ -105,8 +140,7 @@ class SM4(BlockCipher):
         self._key: bytes = key
         self._rkey: List[int] = [0] * 32
         _key_expand(self._key, self._rkey)
-
-        self._block_buffer = bytearray()
+        self._rkey_rev: List[int] = self._rkey[::-1]
 
     def encrypt(self, block: bytes) -> bytes:
         """Encrypt.
@@ -125,26 +159,7 @@ class SM4(BlockCipher):
             raise IncorrectLengthError(
                 "Block", f"{self.block_length()} bytes", f"{len(block)} bytes")
 
-        RK = self._rkey
-
-        X0 = int.from_bytes(block[0:4], "big")
-        X1 = int.from_bytes(block[4:8], "big")
-        X2 = int.from_bytes(block[8:12], "big")
-        X3 = int.from_bytes(block[12:16], "big")
-
-        for i in range(0, 32, 4):
-            X0 = X0 ^ _T0(X1 ^ X2 ^ X3 ^ RK[i])
-            X1 = X1 ^ _T0(X2 ^ X3 ^ X0 ^ RK[i + 1])
-            X2 = X2 ^ _T0(X3 ^ X0 ^ X1 ^ RK[i + 2])
-            X3 = X3 ^ _T0(X0 ^ X1 ^ X2 ^ RK[i + 3])
-
-        BUFFER = self._block_buffer
-        BUFFER.clear()
-        BUFFER.extend(X3.to_bytes(4, "big"))
-        BUFFER.extend(X2.to_bytes(4, "big"))
-        BUFFER.extend(X1.to_bytes(4, "big"))
-        BUFFER.extend(X0.to_bytes(4, "big"))
-        return bytes(BUFFER)
+        return _crypt(block, 0, self._rkey)
 
     def decrypt(self, block: bytes) -> bytes:
         """Decrypt.
@@ -163,26 +178,44 @@ class SM4(BlockCipher):
             raise IncorrectLengthError(
                 "Block", f"{self.block_length()} bytes", f"{len(block)} bytes")
 
-        RK = self._rkey
+        return _crypt(block, 0, self._rkey_rev)
+
+    def _crypt_blocks(self, data: bytes, RK: List[int]) -> bytes:
+        if len(data) % self.block_length() != 0:
+            raise IncorrectLengthError(
+                "Data", f"multiple of {self.block_length()} bytes", f"{len(data)} bytes")
+
+        return b"".join(_crypt(data, i, RK) for i in range(0, len(data), 16))
 
-        X0 = int.from_bytes(block[0:4], "big")
-        X1 = int.from_bytes(block[4:8], "big")
-        X2 = int.from_bytes(block[8:12], "big")
-        X3 = int.from_bytes(block[12:16], "big")
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        """Encrypt several independent blocks at once, i.e. ECB without padding.
 
-        for i in range(0, 32, 4):
-            X0 = X0 ^ _T0(X1 ^ X2 ^ X3 ^ RK[31 - i])
-            X1 = X1 ^ _T0(X2 ^ X3 ^ X0 ^ RK[30 - i])
-            X2 = X2 ^ _T0(X3 ^ X0 ^ X1 ^ RK[29 - i])
-            X3 = X3 ^ _T0(X0 ^ X1 ^ X2 ^ RK[28 - i])
+        Args:
+            data: Plain blocks to encrypt, length must be a multiple of 16 bytes.
 
-        BUFFER = self._block_buffer
-        BUFFER.clear()
-        BUFFER.extend(X3.to_bytes(4, "big"))
-        BUFFER.extend(X2.to_bytes(4, "big"))
-        BUFFER.extend(X1.to_bytes(4, "big"))
-        BUFFER.extend(X0.to_bytes(4, "big"))
-        return bytes(BUFFER)
+        Returns:
+            bytes: Cipher blocks.
+
+        Raises:
+            IncorrectLengthError: Incorrect data length.
+        """
+
+        return self._crypt_blocks(data, self._rkey)
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        """Decrypt several independent blocks at once, i.e. ECB without padding.
+
+        Args:
+            data: Cipher blocks to decrypt, length must be a multiple of 16 bytes.
+
+        Returns:
+            bytes: Plain blocks.
+
+        Raises:
+            IncorrectLengthError: Incorrect data length.
+        """
+
+        return self._crypt_blocks(data, self._rkey_rev)
 
 
 class SM4_CBC(SM4):
@@ -228,8 +261,7 @@ class SM4_CBC(SM4):
         for i in range(0, len(data), self.block_length()):
             block = data[i:i + self.block_length()]
             # XOR with the previous cipher block (for CBC mode)
-            block = bytes(a ^ b for a, b in zip(
-                block, self._previous_cipher_block))
+            block = xor_bytes(block, self._previous_cipher_block)
             encrypted_block = super().encrypt(block)
             cipher_text.extend(encrypted_block)
 
@@ -254,8 +286,7 @@ class SM4_CBC(SM4):
             decrypted_block = super().decrypt(block)
 
             # XOR with the previous cipher block to get the original plaintext
-            decrypted_block = bytes(a ^ b for a, b in zip(
-                decrypted_block, self._previous_cipher_block))
+            decrypted_block = xor_bytes(decrypted_block, self._previous_cipher_block)
             decrypted_data.extend(decrypted_block)
 
             # Update the previous cipher block to the current encrypted block
@@ -303,14 +334,7 @@ class SM4_ECB(SM4):
         # Pad the data to make it a multiple of the block size (16 bytes)
         data = self._pad(data)
 
-        cipher_text = bytearray()
-        # Process each 16-byte block
-        for i in range(0, len(data), self.block_length()):
-            block = data[i:i + self.block_length()]
-            encrypted_block = super().encrypt(block)
-            cipher_text.extend(encrypted_block)
-
-        return bytes(cipher_text)
+        return self.encrypt_blocks(data)
 
     def decrypt(self, data: bytes) -> bytes:
         """Decrypt data using SM4 ECB mode.
@@ -321,15 +345,8 @@ class SM4_ECB(SM4):
         Returns:
             bytes: Decrypted data.
         """
-        # Decrypt in blocks
-        decrypted_data = bytearray()
-        for i in range(0, len(data), self.block_length()):
-            block = data[i:i + self.block_length()]
-            decrypted_block = super().decrypt(block)
-            decrypted_data.extend(decrypted_block)
-
-        # Remove padding
-        return self._unpad(decrypted_data)
+        # Decrypt in blocks and remove padding
+        return self._unpad(self.decrypt_blocks(data))
 
     def _pad(self, data: bytes) -> bytes:
         """Pad data to a multiple of the block size (16 bytes)."""
@@ -1,5 +1,6 @@
 """SM9 Algorithm Implementation Module."""
 
+import functools
 import math
 from typing import Callable, Tuple, Type
 
@@ -8,7 +9,7 @@ from . import primefield as Fp
 from .base import KEYXCHG_MODE, PC_MODE, Hash, SMCoreBase
 from .errors import *
 from .sm3 import SM3
-from .utils import bytes_to_int, int_to_bytes
+from .utils import bytes_to_int, int_to_bytes, xor_bytes
 
 __all__ = [
     "SM9KGC",
@@ -192,21 +193,20 @@ class SM9Core(SMCoreBase):
         self._hlen = math.ceil((5 * math.log2(bnbp.fpn.p)) / 32)  # used for H1 and H2
 
     def _cipher_fn(self, prefix_byte: bytes, Z: bytes, hlen: int) -> int:
-        hash_fn = self._hash_fn
         v = self._hash_cls.hash_length()
 
         count, tail = divmod(hlen, v)
         if count + (tail > 0) > 0xffffffff:
             raise DataOverflowError("cipher fn", f"{0xffffffff * v} bytes")
 
-        Z = prefix_byte + Z
+        hash_fn = self._counter_hash_fn(prefix_byte + Z)
 
         Ha = bytearray()
         for ct in range(1, count + 1):
-            Ha.extend(hash_fn(Z + ct.to_bytes(4, "big")))
+            Ha.extend(hash_fn(ct))
 
         if tail > 0:
-            Ha.extend(hash_fn(Z + (count + 1).to_bytes(4, "big"))[:tail])
+            Ha.extend(hash_fn(count + 1)[:tail])
 
         h = (int.from_bytes(Ha, "big") % (self.bnbp.fpn.p - 1)) + 1
         return h
@@ -382,6 +382,14 @@ class SM9Core(SMCoreBase):
 
         return True
 
+    def _ephemeral_point(self, r: int, Q: Ec.EcPoint) -> Ec.EcPoint:
+        return self.bnbp.ec1.mul(r, Q)
+
+    def _cache_ephemeral_points(self) -> None:
+        """Cache ephemeral points by random number, only for tests and benchmarks with a fixed `rnd_fn`."""
+
+        self._ephemeral_point = functools.lru_cache(maxsize=64)(self._ephemeral_point)
+
     def begin_key_exchange(self, hid_e: bytes, mpk_e: Ec.EcPoint, uid: bytes) -> Tuple[int, Ec.EcPoint]:
         """Generate data to begin key exchange.
 
@@ -397,7 +405,7 @@ class SM9Core(SMCoreBase):
 
         Q = self.bnbp.ec1.add(self.bnbp.kG1(self._H1(uid + hid_e)), mpk_e)
         r = self._randint(1, self.bnbp.fpn.p - 1)
-        R = self.bnbp.ec1.mul(r, Q)
+        R = self._ephemeral_point(r, Q)
         return r, R
 
     def get_secret_data(self, mpk_e: Ec.EcPoint, r: int, R: Ec.EcPoint, sk_e: Ec.EcPoint2) -> Tuple[Fp.Fp12Ele, Fp.Fp12Ele, Fp.Fp12Ele]:
@@ -562,7 +570,7 @@ class SM9Core(SMCoreBase):
         K, C1 = self.encapsulate(hid_e, mpk_e, mlen + mac_klen, uid)
         K1, K2 = K[:mlen], K[mlen:]
 
-        C2 = bytes(map(lambda b1, b2: b1 ^ b2, plain, K1))
+        C2 = xor_bytes(plain, K1)
         C3 = self._mac(K2, C2)
 
         return C1, C2, C3
@@ -590,7 +598,7 @@ class SM9Core(SMCoreBase):
         K = self.decapsulate(C1, mlen + mac_klen, sk_e, uid)
         K1, K2 = K[:mlen], K[mlen:]
 
-        plain = bytes(map(lambda b1, b2: b1 ^ b2, C2, K1))
+        plain = xor_bytes(C2, K1)
 
         u = self._mac(K2, C2)
         if u != C3:
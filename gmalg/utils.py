@@ -18,3 +18,9 @@ def int_to_bytes(i: int) -> bytes:
     """Convert integer to minimum number of bytes required to store its value."""
 
     return i.to_bytes((i.bit_length() + 7) >> 3, "big")
+
+
+def xor_bytes(a: bytes, b: bytes) -> bytes:
+    """Xor two bytes of the same length, computed as big integers instead of byte by byte."""
+
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
@@ -1,5 +1,6 @@
 """ZUC Algorithm Implementation Module."""
 
+import struct
 from typing import List
 
 from .errors import *
@@ -164,3 +165,61 @@ class ZUC:
         self._lfsr_work()
 
         return Z.to_bytes(4, "big")
+
+    # words generated between trimming consumed LFSR cells in `generate_many`
+    _CHUNK_WORDS = 256
+
+    def generate_many(self, n: int) -> bytes:
+        """Generate n pseudo-random words at once.
+
+        Args:
+            n: Number of 32-bit words.
+
+        Returns:
+            bytes: n * 4 bytes pseudo-random words, same as calling `generate` n times.
+
+        Raises:
+            InvalidArgumentError: Negative n.
+        """
+
+        if n < 0:
+            raise InvalidArgumentError(f"Number of words must be non-negative, got {n}.")
+
+        S0 = _S0
+        S1 = _S1
+
+        S = self._lfsr.copy()
+        R1 = self._R1
+        R2 = self._R2
+
+        out = bytearray(n << 2)
+        Z = [0] * self._CHUNK_WORDS
+        for start in range(0, n, self._CHUNK_WORDS):
+            m = min(self._CHUNK_WORDS, n - start)
+            for i in range(m):
+                # S[i:i+16] is current LFSR state
+                W = ((((S[i + 15] >> 15 << 16) | (S[i + 14] & 0xffff)) ^ R1) + R2) & 0xffffffff
+                Z[i] = W ^ (((S[i + 2] & 0xffff) << 16) | (S[i] >> 15))
+
+                W1 = (R1 + (((S[i + 11] & 0xffff) << 16) | (S[i + 9] >> 15))) & 0xffffffff
+                W2 = R2 ^ (((S[i + 7] & 0xffff) << 16) | (S[i + 5] >> 15))
+                X = ((W1 & 0xffff) << 16) ^ (W2 >> 16)
+                X ^= (((X << 2) | (X >> 30)) ^ ((X << 10) | (X >> 22)) ^ ((X << 18) | (X >> 14)) ^ ((X << 24) | (X >> 8))) & 0xffffffff
+                R1 = (S0[X >> 24] << 24) ^ (S1[(X >> 16) & 0xff] << 16) ^ (S0[(X >> 8) & 0xff] << 8) ^ S1[X & 0xff]
+
+                X = ((W2 & 0xffff) << 16) ^ (W1 >> 16)
+                X ^= (((X << 8) | (X >> 24)) ^ ((X << 14) | (X >> 18)) ^ ((X << 22) | (X >> 10)) ^ ((X << 30) | (X >> 2))) & 0xffffffff
+                R2 = (S0[X >> 24] << 24) ^ (S1[(X >> 16) & 0xff] << 16) ^ (S0[(X >> 8) & 0xff] << 8) ^ S1[X & 0xff]
+
+                s0 = S[i]
+                s16 = ((S[i + 15] << 15) + (S[i + 13] << 17) + (S[i + 10] << 21) + (S[i + 4] << 20) + (s0 << 8) + s0) % 0x7fffffff
+                S.append(s16 or 0x7fffffff)
+
+            struct.pack_into(f">{m}I", out, start << 2, *Z[:m])
+            del S[:m]  # keep only the current 16 cells
+
+        self._lfsr = S
+        self._R1 = R1
+        self._R2 = R2
+
+        return bytes(out)
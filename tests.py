@@ -5,6 +5,60 @@ import gmalg.ellipticcurve as Ec
 import gmalg.primefield as Fp
 
 
+class TestPrimeField(unittest.TestCase):
+    def test_sqrt(self):
+        # 4u3, 8u5, 8u1
+        for p in (0x8542D69E_4C044F18_E8B92435_BF6FF7DE_45728391_5C45517D_722EDB8B_08F1DFC3,
+                  0x7FFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFFF_FFFFFFED,
+                  0x3001):
+            fp = Fp.PrimeField(p)
+            for x in (0, 1, 2, 3, 5, 7, 0x1234, p - 1):
+                y = fp.sqrt(x)
+                if y is None:
+                    self.assertEqual(fp.pow(x, (p - 1) >> 1), p - 1)
+                else:
+                    self.assertEqual(fp.mul(y, y), x)
+
+        # composite p = 1 (mod 8) without non-residue, Tonelli-Shanks params are only searched in sqrt
+        fp = Fp.PrimeField(3**4)
+        self.assertRaises(gmalg.errors.InvalidArgumentError, fp.sqrt, 1)
+
+    def test_inv(self):
+        p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
+
+        fp = Fp.PrimeField(p)
+        for x in (1, 2, 0x1234, p - 1):
+            self.assertEqual(fp.mul(fp.inv(x), x), 1)
+            self.assertEqual(fp.inv(x), Fp.PrimeField.inv(fp, x))
+        self.assertEqual(fp.inv(0), 0)
+
+    def test_inv_batch(self):
+        p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
+
+        fp = Fp.PrimeField(p)
+        xs = [1, 2, 3, 0x1234, p - 1]
+        self.assertEqual(fp.inv_batch(xs), [fp.inv(x) for x in xs])
+
+        fp2 = Fp.PrimeField2(p)
+        xs = [(1, 2), (0, 3), (p - 1, 0x1234)]
+        self.assertEqual(fp2.inv_batch(xs), [fp2.inv(x) for x in xs])
+
+    def test_sqr(self):
+        p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
+
+        fp12 = Fp.PrimeField12(p)
+        fp4 = fp12.fp4
+        fp2 = fp4.fp2
+
+        x2 = (0x1234, p - 5)
+        x4 = (x2, (p - 1, 0x5678))
+        x12 = (x4, ((3, 0), (p - 2, 7)), ((0, 0x9ABC), (11, p - 13)))
+
+        self.assertEqual(fp2.sqr(x2), fp2.mul(x2, x2))
+        self.assertEqual(fp4.sqr(x4), fp4.mul(x4, x4))
+        self.assertEqual(fp12.sqr(x12), fp12.mul(x12, x12))
+
+
 class TestEllipticCurve(unittest.TestCase):
     def test_ec(self):
         p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
@@ -30,10 +84,129 @@ class TestEllipticCurve(unittest.TestCase):
 
         self.assertTrue(ec2.mul(n, P2) == ec2.INF)
 
+    def test_mul2(self):
+        p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
+
+        ec = Ec.EllipticCurve(Fp.PrimeField(p), 0, 5)
+
+        P1 = (0x93DE051D_62BF718F_F5ED0704_487D01D6_E1E40869_09DC3280_E8C4E481_7C66DDDD,
+              0x21FE8DDA_4F21E607_63106512_5C395BBC_1C1C00CB_FA602435_0C464CD7_0A3EA616)
+        P2 = ec.mul(0x1234567, P1)
+
+        k1 = 0x0AE4C779_8AA0F119_471BEE11_825BE462_02BB79E2_A5844495_E97C04FF_4DF2548A
+        k2 = 0x7C0240F8_8F1CD4E1_6352A73C_17B7F16F
+
+        self.assertEqual(ec.mul2(k1, P1, k2, P2), ec.add(ec.mul(k1, P1), ec.mul(k2, P2)))
+        for k1, k2 in ((0, 0), (1, 0), (0, 5), (6, 7), (13, 2), (-3, 9)):
+            self.assertEqual(ec.mul2(k1, P1, k2, P1), ec.mul(k1 + k2, P1))
+
+    def test_mul_ladder(self):
+        p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
+
+        ec = Ec.EllipticCurve(Fp.PrimeField(p), 0, 5)
+        ec2 = Ec.EllipticCurve(Fp.PrimeField2(p), (0, 0), (5, 0))
+
+        P1 = (0x93DE051D_62BF718F_F5ED0704_487D01D6_E1E40869_09DC3280_E8C4E481_7C66DDDD,
+              0x21FE8DDA_4F21E607_63106512_5C395BBC_1C1C00CB_FA602435_0C464CD7_0A3EA616)
+        P2 = ((0x85AEF3D0_78640C98_597B6027_B441A01F_F1DD2C19_0F5E93C4_54806C11_D8806141,
+              0x37227552_92130B08_D2AAB97F_D34EC120_EE265948_D19C17AB_F9B7213B_AF82D65B),
+              (0x17509B09_2E845C12_66BA0D26_2CBEE6ED_0736A96F_A347C8BD_856DC76B_84EBEB96,
+              0xA7CF28D5_19BE3DA6_5F317015_3D278FF2_47EFBA98_A71A0811_6215BBA5_C999A7C7))
+
+        k = 0x0AE4C779_8AA0F119_471BEE11_825BE462_02BB79E2_A5844495_E97C04FF_4DF2548A
+
+        self.assertEqual(ec.mul_ladder(k, P1), ec.mul(k, P1))
+        self.assertEqual(ec2.mul_ladder(k, P2), ec2.mul(k, P2))
+        self.assertEqual(ec.mul_ladder(-k, P1), ec.neg(ec.mul(k, P1)))
+        self.assertEqual(ec2.mul_ladder(-k, P2), ec2.neg(ec2.mul(k, P2)))
+
+    def test_wnaf(self):
+        for k in [0, 1, 15, 16, 17, 0x0AE4C779_8AA0F119_471BEE11_825BE462_02BB79E2_A5844495_E97C04FF_4DF2548A]:
+            digits = Ec._wnaf(k, 5)
+            self.assertEqual(sum(d << i for i, d in enumerate(digits)), k)
+            for i, d in enumerate(digits):
+                if d:
+                    self.assertTrue(d & 1 and -16 < d < 16)
+                    self.assertFalse(any(digits[i + 1:i + 5]))
+
+        p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
+        ec = Ec.EllipticCurve(Fp.PrimeField(p), 0, 5)
+        P = (0x93DE051D_62BF718F_F5ED0704_487D01D6_E1E40869_09DC3280_E8C4E481_7C66DDDD,
+             0x21FE8DDA_4F21E607_63106512_5C395BBC_1C1C00CB_FA602435_0C464CD7_0A3EA616)
+        self.assertEqual(ec._odd_multiples(P, 8), [ec.mul(2 * i + 1, P) for i in range(8)])
+
+        k = 0xFFFFFFFF_FFFFFFFF_0000FFFF_00000001
+        self.assertEqual(ec.mul(k, P), ec.mul_ladder(k, P))
+        self.assertEqual(ec.mul(-k, P), ec.neg(ec.mul_ladder(k, P)))
+
+    def test_jacobian(self):
+        p = 0xB6400000_02A3A6F1_D603AB4F_F58EC745_21F2934B_1A7AEEDB_E56F9B27_E351457D
+
+        ec = Ec.EllipticCurve(Fp.PrimeField(p), 0, 5)
+
+        P = (0x93DE051D_62BF718F_F5ED0704_487D01D6_E1E40869_09DC3280_E8C4E481_7C66DDDD,
+             0x21FE8DDA_4F21E607_63106512_5C395BBC_1C1C00CB_FA602435_0C464CD7_0A3EA616)
+        Q = ec.add(P, P)
+        J = ec.jac_dbl(ec.to_jacobian(P))
+
+        self.assertEqual(ec.to_affine(J), Q)
+        self.assertEqual(ec.to_affine(ec.jac_add(J, ec.to_jacobian(P))), ec.add(Q, P))
+        self.assertEqual(ec.to_affine(ec.jac_add(J, ec.jac_dbl(J))), ec.add(Q, ec.add(Q, Q)))
+        self.assertEqual(ec.to_affine(ec.jac_add(J, ec.to_jacobian(Q))), ec.add(Q, Q))
+        self.assertEqual(ec.to_affine(ec.jac_add(J, ec.to_jacobian(ec.neg(Q)))), ec.INF)
+        self.assertEqual(ec.mul(0, P), ec.INF)
+
+        # inlined prime field formulas agree with generic ones, a != 0
+        ecdlp = gmalg.sm2._ecdlp
+        ec = ecdlp.ec
+        J = Ec.EllipticCurve.jac_dbl(ec, ec.to_jacobian(ecdlp.G))
+        K = Ec.EllipticCurve.jac_add(ec, J, J)
+        self.assertEqual(ec.jac_dbl(ec.to_jacobian(ecdlp.G)), J)
+        self.assertEqual(ec.jac_add(J, J), K)
+        self.assertEqual(ec.jac_add(K, J), Ec.EllipticCurve.jac_add(ec, K, J))
+        self.assertEqual(ec.jac_add(J, ec.to_jacobian(ecdlp.G)), Ec.EllipticCurve.jac_add(ec, J, ec.to_jacobian(ecdlp.G)))
+
+    def test_ecdlp_get(self):
+        ecdlp = gmalg.sm2._ecdlp
+        params = (ecdlp.fp.p, ecdlp.ec.a, ecdlp.ec.b, ecdlp.G, ecdlp.fpn.p, ecdlp.h)
+
+        self.assertIs(Ec.ECDLP.get(*params), ecdlp)
+
+    def test_kP(self):
+        ecdlp = gmalg.sm2._ecdlp
+        ec = ecdlp.ec
+        n = ecdlp.fpn.p
+        P = ecdlp.kG(0x1234567)
+
+        for k in [0, 1, 2, 0xFFFFFFFF, n - 1, n, n + 1]:
+            self.assertEqual(ecdlp.kP(k, P), ec.mul(k, P))
+
+        for k in [1, 5, 0xFFFFFFFF, n - 1]:
+            self.assertEqual(ecdlp.kG(-k), ec.neg(ecdlp.kG(k)))
+            self.assertEqual(ecdlp.kP(-k, P), ec.neg(ecdlp.kP(k, P)))
+
+    def test_kG_add_kP(self):
+        ecdlp = gmalg.sm2._ecdlp
+        ec = ecdlp.ec
+        n = ecdlp.fpn.p
+        P = ecdlp.kG(0x1234567)
+
+        for k1, k2 in [(0, 0), (1, 0), (0, 1), (n - 1, n - 2), (0xFFFFFFFF, n >> 1), (-5, 7)]:
+            self.assertEqual(ecdlp.kG_add_kP(k1, k2, P), ec.add(ec.mul(k1, ecdlp.G), ec.mul(k2, P)))
+
 
 class TestSM2(unittest.TestCase):
-    def test_sign1(self):
-        ecdlp = Ec.ECDLP(
+    SK = bytes.fromhex("3945208F 7B2144B1 3F36E38A C6D39F95 88939369 2860B51A 42FB81EF 4DF7C5B8")
+    PK = bytes.fromhex("04"
+                       "09F9DF31 1E5421A1 50DD7D16 1E4BC5C6 72179FAD 1833FC07 6BB08FF3 56F35020"
+                       "CCEA490C E26775A5 2DC6EA71 8CC1AA60 0AED05FB F35E084A 6632F607 2DA9AD13")
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.sm2 = gmalg.SM2()
+
+        # example curves of GM/T 0003
+        cls.ecdlp_fp256 = Ec.ECDLP.get(
             0x8542D69E_4C044F18_E8B92435_BF6FF7DE_45728391_5C45517D_722EDB8B_08F1DFC3,
             0x787968B4_FA32C3FD_2417842E_73BBFEFF_2F3C848B_6831D7E0_EC65228B_3937E498,
             0x63E4C6D3_B23B0C84_9CF84241_484BFE48_F61D59A5_B16BA06E_6E12D1DA_27C5249A,
@@ -41,6 +214,17 @@ class TestSM2(unittest.TestCase):
              0x0680512B_CBB42C07_D47349D2_153B70C4_E5D7FDFC_BFA36EA1_A85841B9_E46E09A2),
             0x8542D69E_4C044F18_E8B92435_BF6FF7DD_29772063_0485628D_5AE74EE7_C32E79B7,
         )
+        cls.ecdlp_fp192 = Ec.ECDLP.get(
+            0xBDB6F4FE_3E8B1D9E_0DA8C0D4_6F4C318C_EFE4AFE3_B6B8551F,
+            0xBB8E5E8F_BC115E13_9FE6A814_FE48AAA6_F0ADA1AA_5DF91985,
+            0x1854BEBD_C31B21B7_AEFC80AB_0ECD10D5_B1B3308E_6DBF11C1,
+            (0x4AD5F704_8DE709AD_51236DE6_5E4D4B48_2C836DC6_E4106640,
+             0x02BB3A02_D4AAADAC_AE24817A_4CA3A1B0_14B52704_32DB27D2),
+            0xBDB6F4FE_3E8B1D9E_0DA8C0D4_0FC96219_5DFAE76F_56564677,
+        )
+
+    def test_sign1(self):
+        ecdlp = self.ecdlp_fp256
         ecc = gmalg.sm2.SM2Core(
             ecdlp, gmalg.SM3,
             lambda _: 0x6CB28D99_385C175C_94F94E93_4817663F_C176D925_DD72B727_260DBAAE_1FB2F96F
@@ -55,14 +239,16 @@ class TestSM2(unittest.TestCase):
         self.assertEqual(s, 0x6FC6DAC3_2C5D5CF1_0C77DFB2_0F7C2EB6_67A45787_2FB09EC5_6327A67E_C7DEEBE7)
 
         self.assertEqual(ecc.verify(b"message digest", r, s, uid, P), True)
+        self.assertEqual(ecc.verify(b"message digesT", r, s, uid, P), False)
+        self.assertEqual(ecc.verify(b"message digest", r, s, bytearray(uid), P), True)
+        self.assertEqual(ecc.entity_info(uid, list(P)), ecc.entity_info(uid, P))
+        self.assertEqual(ecc.verify(b"message digest", r, s, uid, list(P)), True)
 
     def test_sign2(self):
         sm2 = gmalg.SM2(
-            bytes.fromhex("3945208F 7B2144B1 3F36E38A C6D39F95 88939369 2860B51A 42FB81EF 4DF7C5B8"),
+            self.SK,
             b"1234567812345678",
-            bytes.fromhex("04"
-                          "09F9DF31 1E5421A1 50DD7D16 1E4BC5C6 72179FAD 1833FC07 6BB08FF3 56F35020"
-                          "CCEA490C E26775A5 2DC6EA71 8CC1AA60 0AED05FB F35E084A 6632F607 2DA9AD13"),
+            self.PK,
             rnd_fn=lambda _: 0x59276E27_D506861A_16680F3A_D9C02DCC_EF3CC1FA_3CDBE4CE_6D54B80D_EAC1BC21
         )
 
@@ -73,7 +259,7 @@ class TestSM2(unittest.TestCase):
         self.assertEqual(sm2.verify(b"message digest", r, s), True)
 
     def test_sign3(self):
-        d, pk = gmalg.SM2().generate_keypair()
+        d, pk = self.sm2.generate_keypair()
         sm2 = gmalg.SM2(d, b"test", pk)
 
         plain = b"random SM2 sign test random SM2 sign test random SM2 sign test random SM2 sign test random SM2 sign test random SM2 sign test random SM2 sign test random SM2 sign test"
@@ -81,14 +267,7 @@ class TestSM2(unittest.TestCase):
         self.assertEqual(sm2.verify(plain, r, s), True)
 
     def test_encrypt1(self):
-        ecdlp = Ec.ECDLP(
-            0xBDB6F4FE_3E8B1D9E_0DA8C0D4_6F4C318C_EFE4AFE3_B6B8551F,
-            0xBB8E5E8F_BC115E13_9FE6A814_FE48AAA6_F0ADA1AA_5DF91985,
-            0x1854BEBD_C31B21B7_AEFC80AB_0ECD10D5_B1B3308E_6DBF11C1,
-            (0x4AD5F704_8DE709AD_51236DE6_5E4D4B48_2C836DC6_E4106640,
-             0x02BB3A02_D4AAADAC_AE24817A_4CA3A1B0_14B52704_32DB27D2),
-            0xBDB6F4FE_3E8B1D9E_0DA8C0D4_0FC96219_5DFAE76F_56564677,
-        )
+        ecdlp = self.ecdlp_fp192
         ecc = gmalg.sm2.SM2Core(
             ecdlp, gmalg.SM3,
             lambda _: 0x384F3035_3073AEEC_E7A16543_30A96204_D37982A3_E15B2CB5
@@ -106,14 +285,7 @@ class TestSM2(unittest.TestCase):
         self.assertEqual(ecc.decrypt((x1, y1), c2, c3, d), b"encryption standard")
 
     def test_encrypt2(self):
-        ecdlp = Ec.ECDLP(
-            0x8542D69E_4C044F18_E8B92435_BF6FF7DE_45728391_5C45517D_722EDB8B_08F1DFC3,
-            0x787968B4_FA32C3FD_2417842E_73BBFEFF_2F3C848B_6831D7E0_EC65228B_3937E498,
-            0x63E4C6D3_B23B0C84_9CF84241_484BFE48_F61D59A5_B16BA06E_6E12D1DA_27C5249A,
-            (0x421DEBD6_1B62EAB6_746434EB_C3CC315E_32220B3B_ADD50BDC_4C4E6C14_7FEDD43D,
-             0x0680512B_CBB42C07_D47349D2_153B70C4_E5D7FDFC_BFA36EA1_A85841B9_E46E09A2),
-            0x8542D69E_4C044F18_E8B92435_BF6FF7DD_29772063_0485628D_5AE74EE7_C32E79B7,
-        )
+        ecdlp = self.ecdlp_fp256
         ecc = gmalg.sm2.SM2Core(
             ecdlp, gmalg.SM3,
             lambda _: 0x4C62EEFD_6ECFC2B9_5B92FD6C_3D957514_8AFA1742_5546D490_18E5388D_49DD7B4F
@@ -132,10 +304,8 @@ class TestSM2(unittest.TestCase):
 
     def test_encrypt3(self):
         sm2 = gmalg.SM2(
-            bytes.fromhex("3945208F 7B2144B1 3F36E38A C6D39F95 88939369 2860B51A 42FB81EF 4DF7C5B8"),
-            pk=bytes.fromhex("04"
-                             "09F9DF31 1E5421A1 50DD7D16 1E4BC5C6 72179FAD 1833FC07 6BB08FF3 56F35020"
-                             "CCEA490C E26775A5 2DC6EA71 8CC1AA60 0AED05FB F35E084A 6632F607 2DA9AD13"),
+            self.SK,
+            pk=self.PK,
             rnd_fn=lambda _: 0x59276E27_D506861A_16680F3A_D9C02DCC_EF3CC1FA_3CDBE4CE_6D54B80D_EAC1BC21,
         )
 
@@ -149,7 +319,7 @@ class TestSM2(unittest.TestCase):
         self.assertEqual(sm2.decrypt(cipher), b"encryption standard")
 
     def test_encrypt4(self):
-        d, pk = gmalg.SM2().generate_keypair()
+        d, pk = self.sm2.generate_keypair()
         plain = b"random SM2 encrypt test random SM2 encrypt test random SM2 encrypt test random SM2 encrypt test random SM2 encrypt test random SM2 encrypt test random SM2 encrypt test"
 
         sm2 = gmalg.SM2(d, pk=pk)
@@ -167,11 +337,9 @@ class TestSM2(unittest.TestCase):
     def test_pc(self):
         # 8u7
         sm2 = gmalg.sm2
-        sm2_ctx = gmalg.SM2()
+        sm2_ctx = self.sm2
 
-        p_b = bytes.fromhex("04 09F9DF31 1E5421A1 50DD7D16 1E4BC5C6 72179FAD 1833FC07 6BB08FF3 56F35020"
-                            "CCEA490C E26775A5 2DC6EA71 8CC1AA60 0AED05FB F35E084A 6632F607 2DA9AD13")
-        p_p = sm2.bytes_to_point(p_b)
+        p_p = sm2.bytes_to_point(self.PK)
         p_pp = sm2.bytes_to_point(sm2.point_to_bytes(p_p, gmalg.PC_MODE.COMPRESS))
 
         self.assertEqual(p_p, p_pp)
@@ -184,14 +352,7 @@ class TestSM2(unittest.TestCase):
 
     def test_y_sqrt(self):
         # 8u3
-        ecdlp = Ec.ECDLP(
-            0x8542D69E_4C044F18_E8B92435_BF6FF7DE_45728391_5C45517D_722EDB8B_08F1DFC3,
-            0x787968B4_FA32C3FD_2417842E_73BBFEFF_2F3C848B_6831D7E0_EC65228B_3937E498,
-            0x63E4C6D3_B23B0C84_9CF84241_484BFE48_F61D59A5_B16BA06E_6E12D1DA_27C5249A,
-            (0x421DEBD6_1B62EAB6_746434EB_C3CC315E_32220B3B_ADD50BDC_4C4E6C14_7FEDD43D,
-             0x0680512B_CBB42C07_D47349D2_153B70C4_E5D7FDFC_BFA36EA1_A85841B9_E46E09A2),
-            0x8542D69E_4C044F18_E8B92435_BF6FF7DD_29772063_0485628D_5AE74EE7_C32E79B7,
-        )
+        ecdlp = self.ecdlp_fp256
 
         x = 0x0AE4C779_8AA0F119_471BEE11_825BE462_02BB79E2_A5844495_E97C04FF_4DF2548A
         y = 0x7C0240F8_8F1CD4E1_6352A73C_17B7F16F_07353E53_A176D684_A9FE0C6B_B798E857
@@ -200,14 +361,7 @@ class TestSM2(unittest.TestCase):
         self.assertTrue(y_ == y or ecdlp.fp.neg(y_) == y)
 
         # 8u7
-        ecdlp = Ec.ECDLP(
-            0xBDB6F4FE_3E8B1D9E_0DA8C0D4_6F4C318C_EFE4AFE3_B6B8551F,
-            0xBB8E5E8F_BC115E13_9FE6A814_FE48AAA6_F0ADA1AA_5DF91985,
-            0x1854BEBD_C31B21B7_AEFC80AB_0ECD10D5_B1B3308E_6DBF11C1,
-            (0x4AD5F704_8DE709AD_51236DE6_5E4D4B48_2C836DC6_E4106640,
-             0x02BB3A02_D4AAADAC_AE24817A_4CA3A1B0_14B52704_32DB27D2),
-            0xBDB6F4FE_3E8B1D9E_0DA8C0D4_0FC96219_5DFAE76F_56564677,
-        )
+        ecdlp = self.ecdlp_fp192
         x = 0x79F0A954_7AC6D100_531508B3_0D30A565_36BCFC81_49F4AF4A
         y = 0xAE38F2D8_890838DF_9C19935A_65A8BCC8_994BC792_4672F912
 
@@ -215,14 +369,7 @@ class TestSM2(unittest.TestCase):
         self.assertTrue(y_ == y or ecdlp.fp.neg(y_) == y)
 
     def test_keyxchg1(self):
-        ecdlp = Ec.ECDLP(
-            0x8542D69E_4C044F18_E8B92435_BF6FF7DE_45728391_5C45517D_722EDB8B_08F1DFC3,
-            0x787968B4_FA32C3FD_2417842E_73BBFEFF_2F3C848B_6831D7E0_EC65228B_3937E498,
-            0x63E4C6D3_B23B0C84_9CF84241_484BFE48_F61D59A5_B16BA06E_6E12D1DA_27C5249A,
-            (0x421DEBD6_1B62EAB6_746434EB_C3CC315E_32220B3B_ADD50BDC_4C4E6C14_7FEDD43D,
-             0x0680512B_CBB42C07_D47349D2_153B70C4_E5D7FDFC_BFA36EA1_A85841B9_E46E09A2),
-            0x8542D69E_4C044F18_E8B92435_BF6FF7DD_29772063_0485628D_5AE74EE7_C32E79B7,
-        )
+        ecdlp = self.ecdlp_fp256
 
         ecc1 = gmalg.sm2.SM2Core(
             ecdlp, gmalg.SM3,
@@ -286,9 +433,8 @@ class TestSM2(unittest.TestCase):
         self.assertEqual(KA, bytes.fromhex("6C893473 54DE2484 C60B4AB1 FDE4C6E5"))
 
     def test_keyxchg3(self):
-        _sm2 = gmalg.SM2()
-        dA, PA = _sm2.generate_keypair()
-        dB, PB = _sm2.generate_keypair()
+        dA, PA = self.sm2.generate_keypair()
+        dB, PB = self.sm2.generate_keypair()
         sm2A = gmalg.SM2(dA, b"abcdefghijklmnop", PA)
         sm2B = gmalg.SM2(dB, b"1234567812345678", PB)
 
@@ -300,106 +446,148 @@ class TestSM2(unittest.TestCase):
 
         self.assertEqual(KA, KB)
 
+    def test_ephemeral_cache(self):
+        sk = 0x81EB26E9_41BB5AF1_6DF11649_5F906952_72AE2CD6_3D6C4AE1_678418BE_48230029
+        rnd_fn = lambda _: 0xD4DE1547_4DB74D06_491C440D_305E0124_00990F3E_390C7E87_153C12DB_2EA60BB3
+
+        core = gmalg.sm2.SM2Core(gmalg.sm2._ecdlp, gmalg.SM3, rnd_fn)
+        core._cache_ephemeral_points()
+
+        R, t = core.begin_key_exchange(sk)
+        self.assertEqual(core.begin_key_exchange(sk), (R, t))
+        self.assertEqual(core._ephemeral_point.cache_info().hits, 1)
+        self.assertEqual(gmalg.sm2.SM2Core(gmalg.sm2._ecdlp, gmalg.SM3, rnd_fn).begin_key_exchange(sk), (R, t))
+
 
 class TestSM3(unittest.TestCase):
+    DIGEST_5 = bytes.fromhex("91A7ADDE5B0919D53FFB7DC7253F9F345C3C902A759FE5A2493C70ABB7E25095")
+    DIGEST_55 = bytes.fromhex("84FA82E235020F62BEBD48C0995E2AD7CB4B12AC70E90282110D8D972863DC8E")
+    DIGEST_56 = bytes.fromhex("84A1C27DDCC45E60FF8EF4C55084FD280ECF6CE5A1626B0107A768452F1CFCB3")
+    DIGEST_57 = bytes.fromhex("9AC2E4FF798A09A5F48FFDCA727EBECB230EC069A185F4D81B84E44738ADAEC1")
+    DIGEST_64 = bytes.fromhex("7883E626D07F179E5A5E06445462BD08F08156A8DDCE5FE9E6DAE4D6DAD49CF8")
+    DIGEST_69 = bytes.fromhex("40EDF000B67036C78BC4B394FB3F3201D466E5084FFAA1C4EA6A8427D12F4C40")
+    DIGEST_128 = bytes.fromhex("16ABFDD57F52837457D36F7E3B5E806E568E3BDA6AD920259FEC4CEB5B382921")
+    DIGEST_192 = bytes.fromhex("45418F14DC9077297E5E8480664A294DB2C05F73382469933917E662208B948B")
+
     def setUp(self) -> None:
         self.h = gmalg.SM3()
 
     def test_case1(self):
         self.h.update(b"12345")
-        self.assertEqual(self.h.value(), bytes.fromhex("91A7ADDE5B0919D53FFB7DC7253F9F345C3C902A759FE5A2493C70ABB7E25095"))
+        self.assertEqual(self.h.value(), self.DIGEST_5)
 
     def test_case2(self):
         self.h.update(b"1234567812345678123456781234567812345678123456781234567")
-        self.assertEqual(self.h.value(), bytes.fromhex("84FA82E235020F62BEBD48C0995E2AD7CB4B12AC70E90282110D8D972863DC8E"))
+        self.assertEqual(self.h.value(), self.DIGEST_55)
 
     def test_case3(self):
         self.h.update(b"12345678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("84A1C27DDCC45E60FF8EF4C55084FD280ECF6CE5A1626B0107A768452F1CFCB3"))
+        self.assertEqual(self.h.value(), self.DIGEST_56)
 
     def test_case4(self):
         self.h.update(b"123456781234567812345678123456781234567812345678123456781")
-        self.assertEqual(self.h.value(), bytes.fromhex("9AC2E4FF798A09A5F48FFDCA727EBECB230EC069A185F4D81B84E44738ADAEC1"))
+        self.assertEqual(self.h.value(), self.DIGEST_57)
 
     def test_case5(self):
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("7883E626D07F179E5A5E06445462BD08F08156A8DDCE5FE9E6DAE4D6DAD49CF8"))
+        self.assertEqual(self.h.value(), self.DIGEST_64)
     
     def test_case6(self):
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678"
                       b"1234567812345678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("16ABFDD57F52837457D36F7E3B5E806E568E3BDA6AD920259FEC4CEB5B382921"))
+        self.assertEqual(self.h.value(), self.DIGEST_128)
 
     def test_update1(self):
         self.h.update(b"123456781")
         self.h.update(b"2345678123456781234567812345678123456781234567")
-        self.assertEqual(self.h.value(), bytes.fromhex("84FA82E235020F62BEBD48C0995E2AD7CB4B12AC70E90282110D8D972863DC8E"))
+        self.assertEqual(self.h.value(), self.DIGEST_55)
     
     def test_update2(self):
         self.h.update(b"12345")
         self.h.update(b"678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("84A1C27DDCC45E60FF8EF4C55084FD280ECF6CE5A1626B0107A768452F1CFCB3"))
+        self.assertEqual(self.h.value(), self.DIGEST_56)
     
     def test_update3(self):
         self.h.update(b"12345")
         self.h.update(b"6781234567812345678123456781234567812345678123456781")
-        self.assertEqual(self.h.value(), bytes.fromhex("9AC2E4FF798A09A5F48FFDCA727EBECB230EC069A185F4D81B84E44738ADAEC1"))
+        self.assertEqual(self.h.value(), self.DIGEST_57)
     
     def test_update4(self):
         self.h.update(b"12345")
         self.h.update(b"67812345678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("7883E626D07F179E5A5E06445462BD08F08156A8DDCE5FE9E6DAE4D6DAD49CF8"))
+        self.assertEqual(self.h.value(), self.DIGEST_64)
     
     def test_update51(self):
         self.h.update(b"12345")
         self.h.update(b"6781234567812345678123456781234567812345678123456781234567812345")
-        self.assertEqual(self.h.value(), bytes.fromhex("40EDF000B67036C78BC4B394FB3F3201D466E5084FFAA1C4EA6A8427D12F4C40"))
+        self.assertEqual(self.h.value(), self.DIGEST_69)
     
     def test_update52(self):
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678")
         self.h.update(b"12345")
-        self.assertEqual(self.h.value(), bytes.fromhex("40EDF000B67036C78BC4B394FB3F3201D466E5084FFAA1C4EA6A8427D12F4C40"))
+        self.assertEqual(self.h.value(), self.DIGEST_69)
 
     def test_update6(self):
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678")
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("16ABFDD57F52837457D36F7E3B5E806E568E3BDA6AD920259FEC4CEB5B382921"))
+        self.assertEqual(self.h.value(), self.DIGEST_128)
     
     def test_update71(self):
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678")
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678"
                       b"1234567812345678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("45418F14DC9077297E5E8480664A294DB2C05F73382469933917E662208B948B"))
+        self.assertEqual(self.h.value(), self.DIGEST_192)
     
     def test_update72(self):
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678"
                       b"1234567812345678123456781234567812345678123456781234567812345678")
         self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678")
-        self.assertEqual(self.h.value(), bytes.fromhex("45418F14DC9077297E5E8480664A294DB2C05F73382469933917E662208B948B"))
+        self.assertEqual(self.h.value(), self.DIGEST_192)
+
+    def test_copy(self):
+        self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678")
+        h = self.h.copy()
+        h.update(b"12345")
+        self.h.update(b"1234567812345678123456781234567812345678123456781234567812345678"
+                      b"1234567812345678123456781234567812345678123456781234567812345678")
+        self.assertEqual(h.value(), self.DIGEST_69)
+        self.assertEqual(self.h.value(), self.DIGEST_192)
+
+        class SubSM3(gmalg.SM3):
+            pass
+
+        self.assertIs(type(SubSM3().copy()), SubSM3)
 
 
 class TestSM4(unittest.TestCase):
-    def setUp(self) -> None:
-        self.c = gmalg.SM4(bytes.fromhex("0123456789ABCDEFFEDCBA9876543210"))
+    KEY = bytes.fromhex("0123456789ABCDEFFEDCBA9876543210")
+    PLAIN = bytes.fromhex("0123456789ABCDEFFEDCBA9876543210")
+    CIPHER = bytes.fromhex("681edf34d206965e86b3e94f536e4246")
+    CIPHER_1000000 = bytes.fromhex("595298c7c6fd271f0402f804c33d3f66")
+    PLAIN_BLOCKS = bytes.fromhex("0123456789ABCDEFFEDCBA9876543210" "FEDCBA98765432100123456789ABCDEF")
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.c = gmalg.SM4(cls.KEY)
 
     def test_case1(self):
-        cipher = self.c.encrypt(bytes.fromhex("0123456789ABCDEFFEDCBA9876543210"))
-        self.assertEqual(cipher, bytes.fromhex("681edf34d206965e86b3e94f536e4246"))
+        cipher = self.c.encrypt(self.PLAIN)
+        self.assertEqual(cipher, self.CIPHER)
 
         plain = self.c.decrypt(cipher)
-        self.assertEqual(plain, bytes.fromhex("0123456789ABCDEFFEDCBA9876543210"))
+        self.assertEqual(plain, self.PLAIN)
 
     @unittest.skip("SM4 1000000 times encrypt and decrypt.")
     def test_case2(self):
-        cipher = self.c.encrypt(bytes.fromhex("0123456789ABCDEFFEDCBA9876543210"))
+        cipher = self.c.encrypt(self.PLAIN)
         for _ in range(999999):
             cipher = self.c.encrypt(cipher)
-        self.assertEqual(cipher, bytes.fromhex("595298c7c6fd271f0402f804c33d3f66"))
+        self.assertEqual(cipher, self.CIPHER_1000000)
 
         plain = self.c.decrypt(cipher)
         for _ in range(999999):
             plain = self.c.decrypt(plain)
-        self.assertEqual(plain, bytes.fromhex("0123456789ABCDEFFEDCBA9876543210"))
+        self.assertEqual(plain, self.PLAIN)
 
     def test_raises(self):
         self.assertRaises(gmalg.errors.IncorrectLengthError, self.c.encrypt, b"123456781234567")
@@ -407,8 +595,34 @@ class TestSM4(unittest.TestCase):
         self.assertRaises(gmalg.errors.IncorrectLengthError, self.c.decrypt, b"123456781234567")
         self.assertRaises(gmalg.errors.IncorrectLengthError, self.c.decrypt, b"12345678123456781")
 
+    def test_blocks(self):
+        plain = self.PLAIN_BLOCKS
+        cipher = self.c.encrypt_blocks(plain)
+        self.assertEqual(cipher, self.c.encrypt(plain[:16]) + self.c.encrypt(plain[16:]))
+        self.assertEqual(self.c.decrypt_blocks(cipher), plain)
+
+        self.assertRaises(gmalg.errors.IncorrectLengthError, self.c.encrypt_blocks, b"123456781234567")
+
 
 class TestSM9(unittest.TestCase):
+    def test_pairing(self):
+        bnbp = gmalg.sm9._bnbp
+        k = 0x0AE4C779_8AA0F119_471BEE11_825BE462_02BB79E2_A5844495_E97C04FF_4DF2548A
+
+        g = bnbp.e(bnbp.kG1(k), bnbp.G2)
+        self.assertEqual(g, bnbp.e(bnbp.G1, bnbp.kG2(k)))
+        self.assertEqual(g, bnbp.eG2(bnbp.kG1(k)))
+        self.assertEqual(g, bnbp.eG1(bnbp.kG2(k)))
+        hits = bnbp._get_lines.cache_info().hits
+        self.assertEqual(g, bnbp.eG1(bnbp.kG2(k)))  # cached lines
+        self.assertEqual(bnbp._get_lines.cache_info().hits, hits + 1)
+        self.assertEqual(g, bnbp.fp12.pow(bnbp.eG2(bnbp.G1), k))
+
+        # e never caches its G2 argument, it may be a secret key
+        info = bnbp._get_lines.cache_info()
+        bnbp.e(bnbp.G1, bnbp.kG2(k + 1))
+        self.assertEqual(bnbp._get_lines.cache_info(), info)
+
     def test_sign(self):
         hid_s = b"\x01"
         msk_s = bytes.fromhex("0130E7 8459D785 45CB54C5 87E02CF4 80CE0B66 340F319F 348A1D5B 1F2DC5F4")
@@ -576,6 +790,9 @@ class TestSM9(unittest.TestCase):
 
 
 class TestZUC(unittest.TestCase):
+    KEY3 = bytes.fromhex("3d4c4be96a82fdaeb58f641db17b455b")
+    IV3 = bytes.fromhex("84319aa8de6915ca1f6bda6bfbd8c766")
+
     def test_case1(self):
         z = gmalg.ZUC(bytes.fromhex("00000000000000000000000000000000"), bytes.fromhex("00000000000000000000000000000000"))
         self.assertEqual(z.generate(), bytes.fromhex("27bede74"))
@@ -587,10 +804,27 @@ class TestZUC(unittest.TestCase):
         self.assertEqual(z.generate(), bytes.fromhex("7096398b"))
 
     def test_case3(self):
-        z = gmalg.ZUC(bytes.fromhex("3d4c4be96a82fdaeb58f641db17b455b"), bytes.fromhex("84319aa8de6915ca1f6bda6bfbd8c766"))
+        z = gmalg.ZUC(self.KEY3, self.IV3)
         self.assertEqual(z.generate(), bytes.fromhex("14f1c272"))
         self.assertEqual(z.generate(), bytes.fromhex("3279c419"))
 
+    def test_generate_many(self):
+        z = gmalg.ZUC(self.KEY3, self.IV3)
+        self.assertEqual(z.generate_many(2), bytes.fromhex("14f1c272" "3279c419"))
+
+        z1 = gmalg.ZUC(self.KEY3, self.IV3)
+        z2 = gmalg.ZUC(self.KEY3, self.IV3)
+        self.assertEqual(z1.generate_many(40), b"".join(z2.generate() for _ in range(40)))
+        self.assertEqual(z1.generate(), z2.generate())
+
+        # across trimming of consumed LFSR cells
+        n = z1._CHUNK_WORDS + 1
+        self.assertEqual(z1.generate_many(n), b"".join(z2.generate() for _ in range(n)))
+        self.assertEqual(z1.generate_many(0), b"")
+        self.assertEqual(z1.generate(), z2.generate())
+
+        self.assertRaises(gmalg.errors.InvalidArgumentError, z1.generate_many, -1)
+
 
 if __name__ == "__main__":
     unittest.main()